@@ -0,0 +1,259 @@
+"""
+Caches kept alive between scene parsing and invalidated from nodegraph events.
+
+[LICENSE]
+
+    Copyright 2022 Liam Collod
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+
+"""
+import logging
+
+import NodegraphAPI
+
+from . import c
+
+__all__ = [
+    "EventCache",
+    "get_event_nodes",
+    "listen_all",
+    "process_all_events",
+    "invalidate_all",
+]
+
+logger = logging.getLogger("{}.Cache".format(c.name))
+
+
+class EventCache(object):
+    """
+    Base class for a cache that must be invalidated from nodegraph events.
+
+    Events are not listened by the cache itself, they are forwarded by the
+    editors (see ``Editor.GSVDashboardEditor``) that are already listening to
+    them. As such the cache can only be trusted while at least one editor is
+    listening : when it's not the case the cache is emptied and ``is_live``
+    return False, users must then query the nodegraph directly.
+
+    A cache can also be held while the nodegraph is guaranteed to not be
+    modified (ex: during a single parsing), so it can be used even if no
+    editor is listening.
+
+    Subclasses must override ``clear()`` and ``process_event()``.
+
+    Attributes:
+        events(tuple of str or None):
+            event types the cache need to be invalidated, None for all the
+            events forwarded.
+        __listeners(int): number of editors currently forwarding events.
+        __holders(int): number of ``hold(True)`` calls not released yet.
+    """
+
+    events = tuple()
+
+    __instances = list()
+
+    def __init__(self):
+
+        self.__listeners = 0
+        self.__holders = 0
+        EventCache.__instances.append(self)
+
+        return
+
+    @classmethod
+    def get_instances(cls):
+        """
+        Returns:
+            list of EventCache: every cache created in the session.
+        """
+        return list(EventCache.__instances)
+
+    @property
+    def is_live(self):
+        """
+        Returns:
+            bool: True if the cache receive events or is held, and can be
+                trusted.
+        """
+        return self.__listeners > 0 or self.__holders > 0
+
+    @property
+    def is_held(self):
+        """
+        Returns:
+            bool: True if the nodegraph is guaranteed to not change.
+        """
+        return self.__holders > 0
+
+    def listen(self, enabled):
+        """
+        Called when an editor start or stop forwarding events.
+
+        Args:
+            enabled(bool): True if an editor started to forward events.
+        """
+        if enabled:
+            self.__listeners += 1
+            return
+
+        self.__listeners = max(0, self.__listeners - 1)
+        # we will not be notified of changes anymore, so nothing to keep.
+        if not self.is_live:
+            self.clear()
+
+        return
+
+    def hold(self, enabled):
+        """
+        Make the cache live while the caller guarantee the nodegraph is not
+        modified. Every ``hold(True)`` must be followed by a ``hold(False)``.
+
+        Args:
+            enabled(bool): True to start holding, False to release.
+        """
+        if enabled:
+            self.__holders += 1
+            return
+
+        self.__holders = max(0, self.__holders - 1)
+        if not self.is_live:
+            self.clear()
+
+        return
+
+    def process_events(self, event_data):
+        """
+        Args:
+            event_data(list of list):
+                event data from katana
+                [ [ "event type", int, {event source} ], ... ]
+        """
+        if not self.is_live:
+            return
+
+        for event in event_data:
+            if self.events is not None and event[0] not in self.events:
+                continue
+            self.process_event(event[0], event[2] or dict())
+
+        return
+
+    def process_event(self, event_type, event_args):
+        """
+        Update the cache from a single event.
+
+        Args:
+            event_type(str): one of the types specified in ``events``, any
+                if ``events`` is None.
+            event_args(dict): event source as given by Katana.
+        """
+        raise NotImplementedError
+
+    def invalidate(self, nodes):
+        """
+        Remove any data related to the given nodes.
+        Default implementation clear the whole cache.
+
+        Args:
+            nodes(list of NodegraphAPI.Node):
+        """
+        self.clear()
+        return
+
+    def clear(self):
+        """
+        Remove everything from the cache.
+        """
+        raise NotImplementedError
+
+
+def get_event_nodes(event_args):
+    """
+    Return the nodes an event is about.
+
+    Args:
+        event_args(dict): event source as given by Katana.
+
+    Returns:
+        list of NodegraphAPI.Node:
+    """
+    nodes = list()
+
+    node = event_args.get("node")
+    if isinstance(node, NodegraphAPI.Node):
+        nodes.append(node)
+
+    param = event_args.get("param")
+    if param is not None and hasattr(param, "getNode"):
+        node = param.getNode()
+        if node is not None and node not in nodes:
+            nodes.append(node)
+
+    # port events only give the node names
+    for key in ("nodeNameA", "nodeNameB"):
+        node_name = event_args.get(key)
+        if not node_name:
+            continue
+        node = NodegraphAPI.GetNode(node_name)
+        if node is not None and node not in nodes:
+            nodes.append(node)
+
+    return nodes
+
+
+def listen_all(enabled):
+    """
+    Args:
+        enabled(bool): True if an editor started to forward events.
+    """
+    for cache in EventCache.get_instances():
+        cache.listen(enabled)
+    return
+
+
+def process_all_events(event_data):
+    """
+    Forward Katana events to all the caches.
+
+    Args:
+        event_data(list of list):
+            event data from katana
+            [ [ "event type", int, {event source} ], ... ]
+    """
+    for cache in EventCache.get_instances():
+        try:
+            cache.process_events(event_data)
+        except Exception as excp:
+            # better lose the cache than returning outdated results
+            logger.exception(
+                "[process_all_events] Error with cache <{}>, cleared: {}"
+                "".format(cache.__class__.__name__, excp)
+            )
+            cache.clear()
+
+    return
+
+
+def invalidate_all(nodes):
+    """
+    Remove data related to the given nodes from all the caches.
+    To call when the nodegraph is modified and results are needed before the
+    corresponding events are received.
+
+    Args:
+        nodes(list of NodegraphAPI.Node):
+    """
+    for cache in EventCache.get_instances():
+        cache.invalidate(nodes)
+    return
@@ -41,6 +41,7 @@ from UI4.FormMaster import CreateParameterPolicy as CreateParameterPolicy
 from UI4.FormMaster.KatanaFactory import ParameterWidgetFactory as ParameterWidgetFactory
 
 from . import c
+from . import Cache
 from . import EditorResources as resources
 from .EditorComponents import (
     TreeWidgetItemGSV,
@@ -140,11 +141,15 @@ class GSVDashboardEditor(QtWidgets.QWidget):
         events4twupdate = [
             "port_disconnect",
             "port_connect",
+            "node_create",
+            "node_delete",
             "parameter_finalizeValue",
             "parameter_setValue",
             "parameter_setKey",  # don't know why/if needed ?
             "parameter_replaceXML",  # don't know why/if needed ?
             "parameter_removeKey",  # don't know why/if needed ?
+            "parameter_createChild",  # global GSV created
+            "parameter_deleteChild",  # global GSV deleted
             "node_setBypassed",
             "node_setName",
             "undo_openGroup",
@@ -156,6 +161,9 @@ class GSVDashboardEditor(QtWidgets.QWidget):
                 enabled=enabled
             )
 
+        # the parsing caches are only valid while events are forwarded to them
+        Cache.listen_all(enabled)
+
         return
 
     def __idle_callback(self, *args, **kwargs):
@@ -185,6 +193,10 @@ class GSVDashboardEditor(QtWidgets.QWidget):
                 event data from katana
                 [ [ "event type", int, {event source} ], ... ]
         """
+        # caches must always know about the changes, even if the tw update is
+        # already scheduled.
+        Cache.process_all_events(event_data)
+
         if self.__update_tw1:
             return
         # uncomment the under for debuging
@@ -17,18 +17,28 @@
     limitations under the License.
 
 """
+import copy
+import hashlib
+import json
 import pprint
 import re
 from collections import OrderedDict
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping  # Python 2
 import sys
 import logging
+import time
+from multiprocessing.pool import ThreadPool
 # Python 2 ...
 from types import NoneType
 
 try:
     from typing import (
         Optional,
-        List
+        List,
+        Tuple
     )
 except ImportError:
     pass
@@ -36,16 +46,40 @@ except ImportError:
 import NodegraphAPI
 
 from . import c
+from . import Cache
 from .SceneParse import (
     SceneParser,
-    ParseSettings
+    ParseSettings,
+    graph_state_cache
 )
 
 
-__all__ = ["GSVNode", "GSVScene", "GSVObject", "GSVSettings"]
+__all__ = [
+    "GSVNode",
+    "GSVScene",
+    "GSVObject",
+    "GSVSettings",
+    "CompiledGSVSettings",
+    "GlobalGSVTable",
+    "global_gsv_table",
+    "StructureCache",
+    "structure_cache",
+]
 
 logger = logging.getLogger("{}.Node".format(c.name))
 
+try:
+    __intern = intern  # Python 2
+except NameError:
+    __intern = sys.intern
+
+# maximum number of OpScript scripts kept in __opscript_cache
+OPSCRIPT_CACHE_SIZE = 512
+# result of gsv_get_opscript_structure by script hash, shared by all the
+# dashboards. Last used scripts are at the end.
+__opscript_cache = OrderedDict()  # type: OrderedDict
+__opscript_regex = re.compile(r"Interface.GetGraphStateVariable\(\"(.+)\"\)")
+
 
 def _get_parameter(knode, param_path):
     """
@@ -70,17 +104,107 @@ def _get_parameter(knode, param_path):
             "".format(param_path, knode)
         )
 
-    output = list()
+    return __get_parameter_values(param)
+
+
+def _get_parameters(knode, param_paths):
+    """
+    Return the values of multiple parameters in the given node. The node's
+    parameter tree is walked only once, each parameter children being
+    queried a single time.
+
+    Args:
+        knode(NodegraphAPI.Node):
+        param_paths(list of str): parameters path on node
+
+    Returns:
+        dict of str: values holded by each parameter, see _get_parameter.
+            {"param_path": [value1, ...], ...}
+    """
+
+    # children of the group parameters already walked, by path
+    children = dict()
+    output = dict()
 
-    if param.getNumChildren() != 0:
-        for index in range(0, param.getNumChildren()):
-            output.append(param.getChildByIndex(index).getValue(0))
-    else:
-        output = [param.getValue(0)]
+    for param_path in param_paths:
+
+        param = knode.getParameters()
+        parent_path = ""
+
+        for name in param_path.split("."):
+
+            params = children.get(parent_path)
+            if params is None:
+                params = children[parent_path] = dict(
+                    (child.getName(), child) for child in param.getChildren()
+                )
+
+            param = params.get(name)
+            if not param:
+                raise ValueError(
+                    "Parameter <{}> not found on node <{}>"
+                    "".format(param_path, knode)
+                )
+
+            parent_path = "{}.{}".format(parent_path, name)
+            continue
+
+        output[param_path] = __get_parameter_values(param)
+        continue
 
     return output
 
 
+def __get_parameter_values(param):
+    """
+    Args:
+        param(NodegraphAPI.Parameter):
+
+    Returns:
+        list: values of the parameter children, or of the parameter itself
+            if it has no children.
+
+    Notes:
+        Parameters are considered as not multi-sampled.
+    """
+    params = param.getChildren()
+    if params:
+        return [child.getValue(0) for child in params]
+
+    return [param.getValue(0)]
+
+
+def _intern(value):
+    """
+    Args:
+        value(any):
+
+    Returns:
+        any: the interned version of value if it is a str, so it is only
+            stored once in memory. Else value itself.
+    """
+    if type(value) is str:
+        return __intern(value)
+    return value
+
+
+def _freeze_structure(gsvs):
+    """
+    Args:
+        gsvs(dict): as returned by a structure callable.
+
+    Returns:
+        dict: copy of gsvs with interned names and values, and values as
+            tuples instead of lists.
+    """
+    output = dict()
+    for gsvname, gsvvalues in gsvs.items():
+        if isinstance(gsvvalues, list):
+            gsvvalues = tuple(_intern(value) for value in gsvvalues)
+        output[_intern(gsvname)] = gsvvalues
+    return output
+
+
 def gsv_get_opscript_structure(knode):
     """
     Args:
@@ -89,15 +213,28 @@ def gsv_get_opscript_structure(knode):
     Returns:
         dict of str:
     """
-    out = dict()
-
     lua_script = _get_parameter(knode, "script.lua")
     lua_script = lua_script[0]
-    for match in re.finditer(
-            r"Interface.GetGraphStateVariable\(\"(.+)\"\)",
-            lua_script
-    ):
-        out[match.group(1)] = ["*"]
+
+    # unchanged scripts are not scanned again
+    encoded = lua_script
+    if not isinstance(encoded, bytes):
+        encoded = encoded.encode("utf-8")
+    key = hashlib.md5(encoded).hexdigest()
+
+    gsvnames = __opscript_cache.pop(key, None)
+    if gsvnames is None:
+        gsvnames = tuple(
+            match.group(1)
+            for match in __opscript_regex.finditer(lua_script)
+        )
+        while len(__opscript_cache) >= OPSCRIPT_CACHE_SIZE:
+            __opscript_cache.popitem(last=False)
+    __opscript_cache[key] = gsvnames
+
+    out = dict()
+    for gsvname in gsvnames:
+        out[gsvname] = ["*"]
 
     return out
 
@@ -125,10 +262,10 @@ def gsv_get_variableset_structure(knode):
     Returns:
         dict of str:
     """
-    gsvname = _get_parameter(knode, "variableName")
-    gsvname = gsvname[0]
+    params = _get_parameters(knode, ["variableName", "variableValue"])
+    gsvname = params["variableName"][0]
     return {
-        gsvname: _get_parameter(knode, "variableValue")
+        gsvname: params["variableValue"]
     }
 
 
@@ -140,10 +277,10 @@ def gsv_get_variablegroup_structure(knode):
     Returns:
         dict of str:
     """
-    gsvname = _get_parameter(knode, "variableName")
-    gsvname = gsvname[0]
+    params = _get_parameters(knode, ["variableName", "pattern"])
+    gsvname = params["variableName"][0]
     return {
-        gsvname: _get_parameter(knode, "pattern")
+        gsvname: params["pattern"]
     }
 
 
@@ -155,10 +292,10 @@ def gsv_get_variableswitch_structure(knode):
     Returns:
         dict of str:
     """
-    gsvname = _get_parameter(knode, "variableName")
-    gsvname = gsvname[0]
+    params = _get_parameters(knode, ["variableName", "patterns"])
+    gsvname = params["variableName"][0]
     return {
-        gsvname: _get_parameter(knode, "patterns")
+        gsvname: params["patterns"]
     }
 
 
@@ -173,11 +310,28 @@ class GSVSettings(dict):
         callable must return a list of string: list of GSV names
     [nodes.X.values](str or callable):
         callable must return a list of string: list of GSV values
+    [nodes.X.threadsafe](bool):
+        True if the structure callable can be run concurrently on multiple
+        nodes, see ``extraction.workers``. Optional, default to False.
+    [nodes.X.cacheable](bool):
+        True if the structure callable only reads the node it is given, so
+        its result can be kept until the node is modified, see
+        ``StructureCache``. Optional, default to False.
 
     [excluded.asGroupsNodeType](list of str):
         list of node type that should not be considered as groups and children
         are as such not processed.
 
+    [parsing.max_depth](int or None):
+    [parsing.stop_names](list of str):
+    [parsing.stop_types](list of str):
+    [parsing.scope](str or None):
+        limit the scene parsing, see ``SceneParse.ParseSettings``. Optional.
+
+    [extraction.workers](int):
+        number of threads used to run the threadsafe structure callables,
+        0 to run all of them sequentially. Optional, default to 0.
+
     """
 
     __default = {
@@ -186,22 +340,27 @@ class GSVSettings(dict):
             "VariableSwitch": {
                 "action": "getter",
                 "structure": gsv_get_variableswitch_structure,
+                "cacheable": True,
             },
             "VariableEnabledGroup": {
                 "action": "getter",
                 "structure": gsv_get_variablegroup_structure,
+                "cacheable": True,
             },
             "VariableSet": {
                 "action": "setter",
-                "structure": gsv_get_variableset_structure
+                "structure": gsv_get_variableset_structure,
+                "cacheable": True,
             },
             "VariableDelete": {
                 "action": "setter",
-                "structure": gsv_get_variabledelete_structure
+                "structure": gsv_get_variabledelete_structure,
+                "cacheable": True,
             },
             "OpScript": {
                 "action": "getter",
-                "structure": gsv_get_opscript_structure
+                "structure": gsv_get_opscript_structure,
+                "cacheable": True,
             }
 
         },
@@ -211,6 +370,13 @@ class GSVSettings(dict):
             "excluded": {
                 "asGroupsNodeType": []
             },
+            "max_depth": None,
+            "stop_names": [],
+            "stop_types": [],
+            "scope": None,
+        },
+        "extraction": {
+            "workers": 0,
         }
     }
 
@@ -220,22 +386,41 @@ class GSVSettings(dict):
             "template": {
                 "action": ["getter", "setter"],
                 "structure": callable,
+                "threadsafe": bool,
+                "cacheable": bool,
             }
         },
         "parsing": {
             # first index is default
-            "mode": ["logical_upstream", "all_scene", "upstream"],
+            "mode": [
+                "logical_upstream",
+                "all_scene",
+                "upstream",
+                "logical_downstream",
+                "downstream",
+            ],
             "source": None,
             "excluded": {
                 "asGroupsNodeType": list()
-            }
+            },
+            "max_depth": None,
+            "stop_names": list(),
+            "stop_types": list(),
+            "scope": None,
+        },
+        "extraction": {
+            "workers": int,
         }
     }
 
+    # root keys that can be missing
+    __optional = ("extraction",)
+
     def __init__(self, *args, **kwargs):
 
         if not args and not kwargs:
-            super(GSVSettings, self).__init__(self.__default)
+            # nested values are modified by users, they must not be shared
+            super(GSVSettings, self).__init__(copy.deepcopy(self.__default))
         else:
             super(GSVSettings, self).__init__(*args, **kwargs)
             self.validate()
@@ -257,6 +442,9 @@ class GSVSettings(dict):
         # check root keys
         for rk, rv in self.__expected.items():
 
+            if rk in self.__optional and rk not in self:
+                continue
+
             assert isinstance(
                 self.get(rk), type(rv)
             ), pre + "Missing key <{}>".format(rk)
@@ -280,6 +468,11 @@ class GSVSettings(dict):
                         pre + "Key <{}> has an invalid value type: " \
                               "must be a callable.".format(nvkey)
 
+                if nvkey in ("threadsafe", "cacheable"):
+                    assert isinstance(nvvalue, bool), \
+                        pre + "Key <{}> has an invalid value type: " \
+                              "must be a bool.".format(nvkey)
+
         # check parsing.mode
         parsing_mode = self["parsing"].get("mode")
         assert parsing_mode in self.get_expected("parsing.mode"), \
@@ -302,8 +495,32 @@ class GSVSettings(dict):
             type(self.get_expected("parsing.excluded.asGroupsNodeType"))
         ), pre + "Missing key <parsing.excluded.asGroupsNodeType>"
 
+        # check optional parsing limits
+        for key in ("stop_names", "stop_types"):
+            assert isinstance(
+                self["parsing"].get(key, list()),
+                type(self.get_expected("parsing." + key))
+            ), pre + "Key <parsing.{}> value is not a list".format(key)
+
+        max_depth = self["parsing"].get("max_depth")
+        assert max_depth is None or isinstance(max_depth, int), \
+            pre + "Key <parsing.max_depth> value is not None or an int"
+
+        # check optional extraction.workers
+        workers = self.get("extraction", dict()).get("workers", 0)
+        assert isinstance(workers, int) and workers >= 0, \
+            pre + "Key <extraction.workers> value is not a positive int"
+
         return
 
+    def compile(self):
+        """
+        Returns:
+            CompiledGSVSettings: immutable version of the current settings.
+        """
+        self.validate()
+        return CompiledGSVSettings(self)
+
     @classmethod
     def get_expected(cls, keypath):
         """
@@ -323,6 +540,295 @@ class GSVSettings(dict):
         return value
 
 
+class _ReadOnlyDict(Mapping):
+    """
+    Read-only view of a dict.
+
+    Args:
+        data(dict): not copied, must not be modified by the caller after.
+    """
+
+    __slots__ = ("__data",)
+
+    def __init__(self, data):
+        super(_ReadOnlyDict, self).__setattr__("_ReadOnlyDict__data", data)
+        return
+
+    def __setattr__(self, name, value):
+        raise AttributeError(
+            "<{}> is read-only, can't set <{}>."
+            "".format(self.__class__.__name__, name)
+        )
+
+    def __getitem__(self, key):
+        return self.__data[key]
+
+    def __iter__(self):
+        return iter(self.__data)
+
+    def __len__(self):
+        return len(self.__data)
+
+    def __repr__(self):
+        return "{}({!r})".format(self.__class__.__name__, self.__data)
+
+
+class CompiledGSVSettings(object):
+    """
+    Immutable version of a GSVSettings, see ``GSVSettings.compile()``, with
+    the lists converted to frozensets for fast membership tests. Setting an
+    attribute raises an AttributeError.
+
+    Two compiled settings with the same content have the same
+    ``fingerprint`` and are equal, so they can be used as a cache key.
+    The source is compared by node name. Structure callables are compared by
+    module and name when they are module-level functions, else (lambdas,
+    partials, methods, ...) by identity : the fingerprint is then only
+    stable for the session, and only unique while the callable is alive.
+
+    Attributes:
+        excluded(frozenset of str): GSV names excluded
+        extractors(Mapping of str: tuple):
+            read-only {node type: (action, structure callable, threadsafe,
+            cacheable)}.
+        node_types(tuple of str): node types with an extractor, in the
+            settings order.
+        mode(str): parsing.mode
+        source(NodegraphAPI.Node or None): parsing.source
+        excluded_group_types(frozenset of str):
+            parsing.excluded.asGroupsNodeType
+        max_depth(int or None): parsing.max_depth
+        stop_names(frozenset of str): parsing.stop_names
+        stop_types(frozenset of str): parsing.stop_types
+        scope(str or None): parsing.scope
+        workers(int): extraction.workers
+        fingerprint(str): hash of all the above.
+
+    Args:
+        settings(GSVSettings): must be valid.
+    """
+
+    __slots__ = (
+        "excluded",
+        "extractors",
+        "node_types",
+        "mode",
+        "source",
+        "excluded_group_types",
+        "max_depth",
+        "stop_names",
+        "stop_types",
+        "scope",
+        "workers",
+        "fingerprint",
+    )
+
+    def __init__(self, settings):
+
+        set_attr = super(CompiledGSVSettings, self).__setattr__
+        parsing = settings["parsing"]
+
+        set_attr("excluded", frozenset(settings["excluded"]))
+        set_attr("node_types", tuple(settings["nodes"].keys()))
+        set_attr("extractors", _ReadOnlyDict(dict(
+            (node_type, (
+                node_settings["action"],
+                node_settings["structure"],
+                node_settings.get("threadsafe", False),
+                node_settings.get("cacheable", False),
+            ))
+            for node_type, node_settings in settings["nodes"].items()
+        )))
+        set_attr("mode", parsing["mode"])
+        set_attr("source", parsing["source"])
+        set_attr(
+            "excluded_group_types",
+            frozenset(parsing["excluded"]["asGroupsNodeType"])
+        )
+        # optional keys
+        set_attr("max_depth", parsing.get("max_depth"))
+        set_attr("stop_names", frozenset(parsing.get("stop_names", list())))
+        set_attr("stop_types", frozenset(parsing.get("stop_types", list())))
+        set_attr("scope", parsing.get("scope"))
+        set_attr(
+            "workers", settings.get("extraction", dict()).get("workers", 0)
+        )
+        set_attr("fingerprint", self.__get_fingerprint())
+
+        return
+
+    def __setattr__(self, name, value):
+        raise AttributeError(
+            "<{}> is immutable, can't set <{}>."
+            "".format(self.__class__.__name__, name)
+        )
+
+    def __hash__(self):
+        return hash(self.fingerprint)
+
+    def __eq__(self, other):
+        if not isinstance(other, CompiledGSVSettings):
+            return NotImplemented
+        if self.fingerprint != other.fingerprint:
+            return False
+        # the fingerprint can't guarantee it once a callable is garbage
+        # collected and its id reused.
+        return all(
+            extractor[1] is other.extractors[node_type][1]
+            for node_type, extractor in self.extractors.items()
+        )
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __get_fingerprint(self):
+        """
+        Returns:
+            str: md5 hex digest, stable between sessions if all the
+                structure callables are module-level functions.
+        """
+
+        def get_callable_name(function):
+            module_name = getattr(function, "__module__", None)
+            name = getattr(function, "__name__", None)
+            module = sys.modules.get(module_name) if module_name else None
+            if name and getattr(module, name, None) is function:
+                return "{}.{}".format(module_name, name)
+            # can't be found again from its name, use its identity
+            return "{}.{}@{}".format(module_name, name, id(function))
+
+        content = [
+            sorted(self.excluded),
+            sorted(
+                [
+                    node_type,
+                    action,
+                    get_callable_name(structure),
+                    threadsafe,
+                    cacheable,
+                ]
+                for node_type, (action, structure, threadsafe, cacheable)
+                in self.extractors.items()
+            ),
+            self.mode,
+            self.source.getName() if self.source else None,
+            sorted(self.excluded_group_types),
+            self.max_depth,
+            sorted(self.stop_names),
+            sorted(self.stop_types),
+            self.scope,
+            self.workers,
+        ]
+        content = json.dumps(content, sort_keys=True).encode("utf-8")
+        return hashlib.md5(content).hexdigest()
+
+    def get_parse_settings(self, logical, downstream=False):
+        """
+        Args:
+            logical(bool):
+                True to process only logical connections between nodes.
+            downstream(bool):
+                True to find the nodes downstream of the source instead.
+
+        Returns:
+            ParseSettings: to parse the nodegraph from ``source``, only nodes
+                with an extractor are yielded.
+        """
+        return ParseSettings({
+            "include_groups": True,
+            "excluded": {
+                "asGroupsNodeType": list(self.excluded_group_types)
+            },
+            "logical": logical,
+            "emit_types": self.node_types,
+            "stop_types": self.stop_types,
+            "stop_names": self.stop_names,
+            "max_depth": self.max_depth,
+            "scope": self.scope,
+            "downstream": downstream,
+        })
+
+
+class StructureCache(Cache.EventCache):
+    """
+    Result of the ``structure`` callables (see GSVSettings) kept between
+    scene builds, so only the nodes modified since are read again.
+
+    The entries of a node are dropped when a parameter or name event is
+    received for it, so only the result of structure callables reading
+    nothing else than their node can be cached (``cacheable`` setting).
+
+    Attributes:
+        __structures(dict of NodegraphAPI.Node: dict):
+            {node: {structure callable: structure dict}}
+    """
+
+    events = (
+        "parameter_setValue",
+        "parameter_finalizeValue",
+        "parameter_setKey",
+        "parameter_removeKey",
+        "parameter_replaceXML",
+        "parameter_createChild",
+        "parameter_deleteChild",
+        "node_setName",
+        "node_delete",
+    )
+
+    def __init__(self):
+
+        super(StructureCache, self).__init__()
+        self.__structures = dict()
+
+        return
+
+    def __len__(self):
+        return len(self.__structures)
+
+    def get(self, node, structure, cacheable=True):
+        """
+        Args:
+            node(NodegraphAPI.Node):
+            structure(callable): structure function for this node type.
+            cacheable(bool): False to always call the structure function.
+
+        Returns:
+            dict: result of ``structure(node)`` with values as tuples (see
+                _freeze_structure). The caller can modify it.
+
+        Notes:
+            Can be called from multiple threads as long as they query
+            different nodes.
+        """
+        if not cacheable or not self.is_live:
+            return _freeze_structure(structure(node))
+
+        structures = self.__structures.setdefault(node, dict())
+        gsvs = structures.get(structure)
+        if gsvs is None:
+            gsvs = structures[structure] = _freeze_structure(structure(node))
+
+        # values are tuples and can be shared
+        return gsvs.copy()
+
+    def process_event(self, event_type, event_args):
+        self.invalidate(Cache.get_event_nodes(event_args))
+        return
+
+    def invalidate(self, nodes):
+        for node in nodes:
+            self.__structures.pop(node, None)
+        return
+
+    def clear(self):
+        self.__structures = dict()
+        return
+
+
+structure_cache = StructureCache()
+
+
 class GSVNode(object):
     """
     A Katana node that use the GSV feature.
@@ -339,25 +845,29 @@ class GSVNode(object):
             Action performed on GSV: setter or getter.
             Used by the corresponding properties method.
         gsvs(dict of str):
-            dictionary of gsv names with their asociated list of value
-            {"gsvname": [value1, ...], ...}
+            dictionary of gsv names with their asociated tuple of value
+            {"gsvname": (value1, ...), ...}
 
 
     """
+    __slots__ = ("scene", "node", "type", "gsv_action", "gsvs")
+
     action_getter = "getter"
     action_setter = "setter"
 
-    def __init__(self, node, scene):
+    def __init__(self, node, scene, gsvs=None):
 
         self.scene = scene  # type: GSVScene
         self.node = node
         self.type = node.getType()
 
-        self.gsv_action = None
-        self.gsv_action = self.scene.settings["nodes"][self.type]["action"]
+        extractor = self.scene.compiled.extractors[self.type]
+        action, structure, _, cacheable = extractor
+        self.gsv_action = action
 
-        self.gsvs = self.scene.settings["nodes"][self.type]["structure"]  # type: callable
-        self.gsvs = self.gsvs(node)  # type: dict
+        if gsvs is None:
+            gsvs = structure_cache.get(node, structure, cacheable)
+        self.gsvs = gsvs  # type: dict
 
         logger.debug(
             "[GSVNode][__init__] Finished for node <{}> // "
@@ -394,6 +904,21 @@ class GSVNode(object):
         """
         return self.gsv_action == "getter"
 
+    def todict(self):
+        """
+        Return a dictionnary representation of the class.
+        """
+        return {
+            "name": self.node_name,
+            "type": self.type,
+            "action": self.gsv_action,
+            "gsvs": dict(
+                (gsvname, list(gsvvalues)
+                 if isinstance(gsvvalues, tuple) else gsvvalues)
+                for gsvname, gsvvalues in self.gsvs.items()
+            )
+        }
+
     def select_edit(self):
         """
         Select and set the katana node to edited in the UI.
@@ -403,6 +928,106 @@ class GSVNode(object):
         return
 
 
+class GlobalGSVTable(Cache.EventCache):
+    """
+    The global GSVs defined on the root node ``variables`` parameter, with
+    their current value and options.
+
+    Kept between scene builds while live, and rebuilt only when an event is
+    received for a parameter under ``variables``.
+
+    Attributes:
+        __table(OrderedDict or None):
+            {gsv name: {"value": str or None, "options": list of str}}
+    """
+
+    events = (
+        "parameter_finalizeValue",
+        "parameter_setValue",
+        "parameter_setKey",
+        "parameter_removeKey",
+        "parameter_replaceXML",
+        "parameter_createChild",
+        "parameter_deleteChild",
+    )
+
+    def __init__(self):
+
+        super(GlobalGSVTable, self).__init__()
+        self.__table = None
+
+        return
+
+    @staticmethod
+    def __build():
+        """
+        Returns:
+            OrderedDict: see __table
+        """
+        time = NodegraphAPI.GetCurrentTime()
+        table = OrderedDict()
+
+        global_gsv_param = NodegraphAPI.GetRootNode().getParameter('variables')
+        if not global_gsv_param:
+            return table
+
+        for gsv_param in global_gsv_param.getChildren():
+
+            value_param = gsv_param.getChild("value")
+            options_param = gsv_param.getChild("options")
+            table[gsv_param.getName()] = {
+                "value": value_param.getValue(time) if value_param else None,
+                "options": [
+                    option.getValue(time)
+                    for option in options_param.getChildren()
+                ] if options_param else list()
+            }
+
+            continue
+
+        return table
+
+    def get(self):
+        """
+        Returns:
+            OrderedDict:
+                {gsv name: {"value": str or None, "options": list of str}}
+                To not modify.
+        """
+        if self.__table is None or not self.is_live:
+            table = self.__build()
+            if not self.is_live:
+                return table
+            self.__table = table
+
+        return self.__table
+
+    def process_event(self, event_type, event_args):
+
+        param = event_args.get("param")
+        if param is None or not hasattr(param, "getNode"):
+            return
+        if param.getNode() != NodegraphAPI.GetRootNode():
+            return
+
+        # "" is the root parameter itself
+        if param.getFullName(False).split(".")[0] in ("variables", ""):
+            self.clear()
+        return
+
+    def invalidate(self, nodes):
+        if NodegraphAPI.GetRootNode() in nodes:
+            self.clear()
+        return
+
+    def clear(self):
+        self.__table = None
+        return
+
+
+global_gsv_table = GlobalGSVTable()
+
+
 class GSVObject(object):
     """
     Represent a GSV as a python object. Allow to know which node is using this
@@ -413,6 +1038,9 @@ class GSVObject(object):
 
     a GSV can be local or global (see Katana doc).
 
+    ``nodes``, ``values``, ``type`` and ``locked`` are only computed on first
+    access, from the scene index at the time ``build()`` was called.
+
     Args:
         name(str): gsv name used in the nodegraph
         scene(GSVScene): parent scene
@@ -420,106 +1048,121 @@ class GSVObject(object):
     Attributes:
         name: Name of the local GSV
         scene: Parent scene this GSV can found in.
-        nodes: List of nodes that are using this GSV.
-        values: List of value the GSV can take.
+        nodes: tuple of nodes that are using this GSV.
+        values: tuple of value (str) the GSV can take.
         type: If the gsv is global/local. Used by the corresponding properties.
 
     """
 
-    __instances = list()
+    __slots__ = (
+        "name",
+        "scene",
+        "__index",
+        "__nodes",
+        "__values",
+        "__type",
+        "__locked",
+    )
 
     global_type = "global"
     local_type = "local"
 
+    # value of the attributes not computed yet
+    __unbuilt = object()
+
     def __new__(cls, *args, **kwargs):
 
         name = kwargs.get("name") or args[0]  # type: str
         scene = kwargs.get("scene") or args[1]  # type: GSVScene
 
         # If the variable name is specified as excluded return None
-        if name in scene.settings["excluded"]:
+        if name in scene.compiled.excluded:
             return None
 
-        # try to find if an instance of this class with the same name and same
-        # parented scene already exists.
+        # try to find if an instance of this class with the same name already
+        # exists in the parent scene.
         # If yes, return it instead of creating a new one.
-        for instance in cls.__instances:
-            if instance.name == name and instance.scene == scene:
-                return instance  # type: GSVObject
+        instance = scene.gsv_instances.get(name)
+        if instance is not None:
+            return instance  # type: GSVObject
 
         new_instance = super(GSVObject, cls).__new__(cls)
-        cls.__instances.append(new_instance)
+        scene.gsv_instances[name] = new_instance
         return new_instance
 
     def __init__(self, name, scene):
 
-        self.name = name  # type: str
+        self.name = _intern(name)  # type: str
         self.scene = scene  # type: GSVScene
-        self.nodes = list()  # type: List[GSVNode]
-        self.values = list()  # type: List[str]
-        self.type = None  # type: str
+        # (gsv_nodes, gsv_values, global_gsvs) of the scene, set by build()
+        self.__index = None  # type: Optional[tuple]
+        self.__reset()
 
-    def __build_nodes(self):
+    def __reset(self):
         """
-        Find all the nodes in the scene that use the current gsv name.
-        This nodes are setter and getters.
+        Forget the attributes already computed.
         """
-
-        # node order must be maintained
-        self.nodes = list()
-
-        for gsvnode in self.scene.nodes:
-
-            if isinstance(gsvnode.gsvs.get(self.name), list):
-                self.nodes.append(gsvnode)
-
-            continue
-
+        self.__nodes = self.__unbuilt
+        self.__values = self.__unbuilt
+        self.__type = self.__unbuilt
+        self.__locked = self.__unbuilt
         return
 
-    def __build_values(self):
+    def __get_index(self):
         """
-        Get all the potential values this GSV can take by iterating through the
-        nodes using it.
+        Returns:
+            tuple: (gsv_nodes, gsv_values, global_gsvs) to build from.
         """
+        if self.__index is None:
+            return (
+                self.scene.gsv_nodes,
+                self.scene.gsv_values,
+                self.scene.global_gsvs
+            )
+        return self.__index
 
-        # reset self.value first
-        self.values = list()
-
-        # iterate through all the nodes (think to build it first !)
-        for node in self.nodes:
-
-            # the parameter holding the potential variables value might
-            # have children (ex:VariableSwitch)
-            v = node.gsvs.get(self.name)
-            if v:
-                # make sure every item inside is a str with map()
-                self.values.extend(map(str, v))
+    @property
+    def nodes(self):
+        """
+        Nodes in the scene that use the current gsv name.
+        This nodes are setter and getters.
 
-            continue
+        Returns:
+            tuple of GSVNode:
+        """
+        if self.__nodes is self.__unbuilt:
+            # node order is maintained by the scene index
+            self.__nodes = tuple(self.__get_index()[0].get(self.name, tuple()))
+        return self.__nodes
 
-        # remove duplicates values
-        self.values = list(OrderedDict.fromkeys(self.values))
+    @property
+    def values(self):
+        """
+        All the potential values this GSV can take from the nodes using it.
 
-        return
+        Returns:
+            tuple of str:
+        """
+        if self.__values is self.__unbuilt:
+            # already without duplicates and ordered by the scene index
+            self.__values = tuple(
+                self.__get_index()[1].get(self.name, tuple())
+            )
+        return self.__values
 
-    def __set_type(self):
+    @property
+    def type(self):
         """
-        Find if the GSV name is in global GSV and set type attribute to global
-         or local accordingly.
+        Returns:
+            str: global_type if the GSV name is in global GSV, else
+                local_type.
         """
-
-        global_gsv_param = NodegraphAPI.GetRootNode().getParameter('variables')
-        global_gsvs = [
-            param.getName() for param in global_gsv_param.getChildren()
-        ]
-
-        if self.name in global_gsvs:
-            self.type = self.global_type
-        else:
-            self.type = self.local_type
-
-        return
+        if self.__type is self.__unbuilt:
+            if self.name in self.__get_index()[2]:
+                self.__type = self.global_type
+            else:
+                self.__type = self.local_type
+        return self.__type
 
     @property
     def locked(self):
@@ -534,40 +1177,72 @@ class GSVObject(object):
             None or str:
         """
 
+        if self.__locked is not self.__unbuilt:
+            return self.__locked
+
         value = None
 
         # self.nodes should be ordered by the nodegraph flow, meaning the last
         # setter node we find is the one used to set the value
         for node in self.nodes:
             if node.is_setter:
-                # gsv_values return a list but for setter nodes this list will
-                # always have one index anyway.
-                value = node.gsvs.get(self.name, list())[0]
+                # gsv_values return a tuple but for setter nodes this tuple
+                # will always have one index anyway.
+                value = node.gsvs.get(self.name, tuple())[0]
 
+        self.__locked = value
         return value
 
     @property
     def is_global(self):
         return self.type == self.global_type
 
+    @property
+    def global_data(self):
+        """
+        Returns:
+            dict or None:
+                {"value": str or None, "options": list of str} of the global
+                GSV with this name, None if the GSV is local.
+        """
+        return self.scene.global_gsvs.get(self.name)
+
     @property
     def is_local(self):
         return self.type == self.local_type
 
-    def build(self):
+    def build(self, reset=True):
+        """
+        Bind the GSV to the current scene index. Attributes are computed on
+        first access.
 
-        self.__build_nodes()
-        self.__build_values()
-        self.__set_type()
+        Args:
+            reset(bool):
+                False to keep the attributes already computed, when the
+                scene was rebuilt without affecting this GSV.
+        """
+
+        self.__index = (
+            self.scene.gsv_nodes,
+            self.scene.gsv_values,
+            self.scene.global_gsvs
+        )
+        if reset:
+            self.__reset()
 
         logger.debug(
             "[GSVObject][build] Finished for name=<{}>".format(self.name)
         )
         return
 
-    def todict(self):
+    def todict(self, detailed=False):
         """
         Return a dictionnary representation of the class.
+
+        Args:
+            detailed(bool):
+                True to have each node as a dict (see GSVNode.todict),
+                else only its str representation.
         """
 
         if not self.values:
@@ -575,11 +1250,16 @@ class GSVObject(object):
         if not self.nodes:
             logger.warning("[GSVObject][todict] self.nodes is empty")
 
+        if detailed:
+            nodes = [node.todict() for node in self.nodes]
+        else:
+            nodes = [str(node) for node in self.nodes]
+
         return {
             "type": self.type,
             "name": self.name,
-            "values": self.values,
-            "nodes": map(str, self.nodes),
+            "values": list(self.values),
+            "nodes": nodes,
             "locked": self.locked
         }
 
@@ -592,6 +1272,21 @@ class GSVScene(object):
     Attributes:
         nodes(List[GSVNode]): list of GSVnodes
         gsvs(List[GSVObject]): list of GSVObject build from <nodes>
+        gsv_instances(dict of str: GSVObject):
+            GSVObject created for this scene by name, so the same instance is
+            returned for a name. Released with the scene.
+        gsv_nodes(OrderedDict of str: List[GSVNode]):
+            nodes using each gsv name, names in the order they are first found.
+        gsv_values(dict of str: OrderedDict):
+            values (as keys) each gsv name can take, in the order they are
+            first found.
+        global_gsvs(OrderedDict):
+            global GSVs when the scene was built, see GlobalGSVTable.get
+        compiled(CompiledGSVSettings):
+            settings compiled when the scene was created or last built.
+        extraction_times(OrderedDict of str: float):
+            seconds spent in the structure callables by node type during
+            the last build, only filled when ``extraction.workers`` is used.
 
     Args:
         settings(GSVSettings):
@@ -600,111 +1295,201 @@ class GSVScene(object):
     def __init__(self, settings):
 
         self.settings = settings  # type: GSVSettings
+        self.compiled = settings.compile()  # type: CompiledGSVSettings
         self.nodes = list()  # type: List[GSVNode]
         self.gsvs = list()  # type: List[GSVObject]
-
-    def __parse_all(self):
+        self.gsv_instances = dict()  # type: dict
+        self.gsv_nodes = OrderedDict()  # type: OrderedDict
+        self.gsv_values = dict()  # type: dict
+        self.global_gsvs = OrderedDict()  # type: OrderedDict
+        self.extraction_times = OrderedDict()  # type: OrderedDict
+        # index of each Katana node in self.nodes
+        self.__positions = dict()  # type: dict
+        # True if a node returned values that are not a list
+        self.__irregular = False
+
+    def __iter_all(self):
         """
-        Build the <nodes> attribute.
+        Yields:
+            NodegraphAPI.Node: all the nodes in the scene with a type
+                specified in settings.
         """
         # node order must be maintained
 
-        for node_class in self.settings["nodes"].keys():
+        for node_class in self.compiled.node_types:
 
             nodes = NodegraphAPI.GetAllNodesByType(
                 node_class,
                 sortByName=False
             )  # type: list
             for node in nodes:
-
-                self.nodes.append(GSVNode(node, scene=self))
+                yield node
 
             continue
 
-        self.__parse_post_actions()
         return
 
-    def __parse_upstream(self, logical):
+    def __iter_connected(self, logical, downstream=False):
         """
-        Build the <nodes> attribute.
-
         Args:
             logical(bool):
                 True to process only logical connections between nodes.
+            downstream(bool):
+                True to find the nodes downstream of the source instead.
+
+        Yields:
+            NodegraphAPI.Node: upstream nodes with a type specified in
+                settings, in the order they are found.
         """
         # node order must be maintained
-        # if not logical:
-        #     raise NotImplementedError(
-        #         "__parse_upstream is not implemented yet."
-        #     )
 
-        source = self.settings["parsing"]["source"]
+        source = self.compiled.source
         if not source:
             # By safety but this should never happens
             raise ValueError(
-                "Can't perform __parse_logical_upstream as"
+                "Can't perform __iter_connected as"
                 "no source has been submitted through settings"
             )
 
-        settings = ParseSettings()
-        settings.include_groups = True
-        settings.logical = logical
-        settings.exluded_asGroupsNodeType = self.settings[
-            "parsing"]["excluded"]["asGroupsNodeType"]
-
-        # list of all upstream logical nodes, need to be filtered after
         scene = SceneParser()
-        scene.settings = settings
-        upstream_nodes = scene.get_upstream_nodes(source)
+        scene.settings = self.compiled.get_parse_settings(logical, downstream)
+
+        for knode in scene.iter_upstream_nodes(source):
+            yield knode
+
+        if logical:
+            logger.debug(
+                "[GSVScene][__iter_connected] GraphState cache: {}"
+                "".format(graph_state_cache.get_stats())
+            )
+        return
+
+    def __iter_knodes(self, include_bypassed=False):
+        """
+        Args:
+            include_bypassed(bool): True to also yield disabled nodes.
+
+        Yields:
+            NodegraphAPI.Node:
+                not disabled nodes using the gsv feature depending of the
+                mode specified in self.settings
+        """
+
+        mode = self.compiled.mode
+
+        if mode == "all_scene":
+            knodes = self.__iter_all()
+
+        elif mode == "logical_upstream":
+            knodes = self.__iter_connected(logical=True)
+
+        elif mode == "upstream":
+            knodes = self.__iter_connected(logical=False)
+
+        elif mode == "logical_downstream":
+            knodes = self.__iter_connected(logical=True, downstream=True)
 
-        for knode in upstream_nodes:
+        elif mode == "downstream":
+            knodes = self.__iter_connected(logical=False, downstream=True)
 
-            # filter nodes using nodeTypes specified in settings
-            if knode.getType() not in self.settings["nodes"].keys():
+        else:
+            raise ValueError(
+                "Unsuported mode <{}> in settings passed.".format(mode)
+            )
+
+        for knode in knodes:
+
+            # remove nodes that are disabled
+            if not include_bypassed and knode.isBypassed():
                 continue
 
-            gsvnode = GSVNode(node=knode, scene=self)
-            self.nodes.append(gsvnode)
-            continue
+            yield knode
 
-        self.__parse_post_actions()
         return
 
-    def __parse_post_actions(self):
+    def iter_nodes(self, include_bypassed=False):
         """
-        Actions that need to be perforemed post parsing methods execution.
+        Find the nodes in the nodegraph that use the gsv feature depending
+        of the mode specified in self.settings, and yield them as soon as they
+        are found.
+
+        Unlike ``build()`` this doesn't modify the scene, and allow to stop
+        the parsing early. Disabled nodes are skipped unless
+        ``include_bypassed`` is True.
+
+        Args:
+            include_bypassed(bool): True to also yield disabled nodes.
+
+        Yields:
+            GSVNode:
         """
-        # remove nodes that are disabled
-        self.nodes = filter(
-            lambda gsvnode: not gsvnode.node.isBypassed(), self.nodes
-        )
+
+        for knode in self.__iter_knodes(include_bypassed=include_bypassed):
+            yield GSVNode(node=knode, scene=self)
 
         return
 
-    def __build_nodes(self):
+    def get_first_node(self, gsv_name, action=None):
+        """
+        Return the first node found using the given GSV. The parsing stop as
+        soon as it is found.
+
+        For example for upstream modes, ``get_first_node(name, "setter")``
+        return the nearest upstream node setting the GSV (if any).
+
+        Args:
+            gsv_name(str): name of the GSV the node must use.
+            action(str or None):
+                GSVNode.action_getter or GSVNode.action_setter to only
+                consider nodes doing this action, None for any.
+
+        Returns:
+            GSVNode or None: None if not found.
+        """
+
+        for gsvnode in self.iter_nodes():
+
+            if action and gsvnode.gsv_action != action:
+                continue
+            if gsv_name in gsvnode.gsvs:
+                return gsvnode
+
+        return None
+
+    def __build_nodes(self, reused=None):
         """
         Find all the nodes in the nodegraph that use the gsv feature depending
         of the mode specified in self.settings.
+
+        Args:
+            reused(dict of NodegraphAPI.Node: GSVNode or None):
+                GSVNode to use instead of creating a new one for a node.
         """
+        reused = reused or dict()
 
         # reset self.nodes first
         self.nodes = list()
+        self.gsv_nodes = OrderedDict()
+        self.gsv_values = dict()
+        self.__irregular = False
 
-        mode = self.settings["parsing"]["mode"]
-
-        if mode == "all_scene":
-            self.__parse_all()
-
-        elif mode == "logical_upstream":
-            self.__parse_upstream(logical=True)
+        knodes = list(self.__iter_knodes())
+        extracted = self.__extract(
+            [knode for knode in knodes if knode not in reused]
+        )
 
-        elif mode == "upstream":
-            self.__parse_upstream(logical=False)
+        for knode in knodes:
 
-        else:
-            raise ValueError(
-                "Unsuported mode <{}> in settings passed.".format(mode)
+            gsvnode = reused.get(knode) or GSVNode(
+                node=knode, scene=self, gsvs=extracted.get(knode)
             )
+            self.nodes.append(gsvnode)
+            self.__index_node(gsvnode)
+            continue
+
+        self.__positions = dict(
+            (gsvnode.node, index) for index, gsvnode in enumerate(self.nodes)
+        )
 
         logger.debug(
             "[GSVObject][__build_nodes] Finished. {} nodes found."
@@ -713,6 +1498,96 @@ class GSVScene(object):
 
         return
 
+    def __extract(self, knodes):
+        """
+        Run the structure callables of the given nodes when
+        ``extraction.workers`` is specified. Threadsafe ones run concurrently
+        in a pool of this size, the others sequentially.
+
+        Args:
+            knodes(list of NodegraphAPI.Node):
+
+        Returns:
+            dict of NodegraphAPI.Node: dict:
+                structure of each node, empty if workers are not used.
+        """
+
+        self.extraction_times = OrderedDict()
+        workers = self.compiled.workers
+        if not workers:
+            return dict()
+
+        extractors = self.compiled.extractors
+
+        def extract(knode):
+            _, structure, _, cacheable = extractors[knode.getType()]
+            start_time = time.time()
+            gsvs = structure_cache.get(knode, structure, cacheable)
+            return gsvs, time.time() - start_time
+
+        pooled = list()
+        results = dict()
+        for knode in knodes:
+            if extractors[knode.getType()][2]:
+                pooled.append(knode)
+            else:
+                results[knode] = extract(knode)
+
+        if pooled:
+            pool = ThreadPool(min(workers, len(pooled)))
+            try:
+                results.update(zip(pooled, pool.map(extract, pooled)))
+            finally:
+                pool.close()
+                pool.join()
+
+        # timings are summed in the nodes order to be deterministic
+        extracted = dict()
+        for knode in knodes:
+            gsvs, duration = results[knode]
+            extracted[knode] = gsvs
+            node_type = knode.getType()
+            self.extraction_times[node_type] = (
+                self.extraction_times.get(node_type, 0.0) + duration
+            )
+
+        logger.debug(
+            "[GSVScene][__extract] Finished for {} nodes ({} pooled with {} "
+            "workers): {}".format(
+                len(knodes), len(pooled), workers, dict(self.extraction_times)
+            )
+        )
+        return extracted
+
+    def __index_node(self, gsvnode):
+        """
+        Add the given node to the gsv_nodes and gsv_values indexes.
+
+        Args:
+            gsvnode(GSVNode):
+        """
+
+        for gsvname, gsvvalues in gsvnode.gsvs.items():
+
+            nodes = self.gsv_nodes.get(gsvname)
+            if nodes is None:
+                nodes = self.gsv_nodes[gsvname] = list()
+                self.gsv_values[gsvname] = OrderedDict()
+
+            if not isinstance(gsvvalues, tuple):
+                self.__irregular = True
+                continue
+
+            nodes.append(gsvnode)
+            # make sure every value is a str, duplicates are removed by keys
+            values = self.gsv_values[gsvname]
+            for value in gsvvalues:
+                values[_intern(str(value))] = None
+
+            continue
+
+        return
+
     def __build_gsvs(self):
         """
         From the node list find what gsv is used and build its object.
@@ -721,23 +1596,20 @@ class GSVScene(object):
         # reset self.gsvs first
         self.gsvs = list()
 
-        for gsvnode in self.nodes:
-
-            for gsvname in gsvnode.gsvs.keys():
+        # names are unique and in the order they were found in self.nodes
+        for gsvname in self.gsv_nodes.keys():
 
-                gsv = GSVObject(gsvname, self)  # can return None !
-                # gsv might be excluded, so it returns None
-                if not gsv:
-                    continue
-                # avoid adding multiples times the same instance
-                if gsv in self.gsvs:
-                    continue
-
-                self.gsvs.append(gsv)
+            gsv = GSVObject(gsvname, self)  # can return None !
+            # gsv might be excluded, so it returns None
+            if not gsv:
                 continue
 
+            self.gsvs.append(gsv)
             continue
 
+        # forget the GSVs not used anymore since the previous build
+        self.gsv_instances = dict((gsv.name, gsv) for gsv in self.gsvs)
+
         # TODO why this is not in the above loop ?
         # we don't forget to build the gsv object if we want to use its attributes
         for gsvlocal in self.gsvs:
@@ -756,10 +1628,291 @@ class GSVScene(object):
         Fill the <nodes> and <gsvs> instance attributes.
         """
 
+        # settings might have been modified since the scene creation
+        self.compiled = self.settings.compile()
+        self.global_gsvs = global_gsv_table.get()
         self.__build_nodes()
         self.__build_gsvs()
 
         return
 
-    def todict(self):
-        return {"gsvs": list(map(lambda obj: obj.todict(), self.gsvs))}
+    def update(self, changed_nodes, parameters_only=False):
+        """
+        Update the scene after the given Katana nodes were created, deleted or
+        modified. Must have been built before.
+
+        By default the nodegraph is still parsed and the index of every node
+        rebuilt (connections, bypass, ... might have changed which nodes are
+        found), so the cost still depends on the scene size. Only the given
+        nodes are read again, and only the GSVs using them, or whose nodes
+        changed, are built again.
+
+        With ``parameters_only``, if the parsing mode is not logical, the
+        nodegraph is not parsed and only the GSVs used by the given nodes
+        are indexed again : the cost depends on the edit instead.
+
+        Args:
+            changed_nodes(list of NodegraphAPI.Node):
+            parameters_only(bool):
+                True if only parameters of the given nodes changed : no
+                connection, bypass, creation, deletion or renaming.
+
+        Returns:
+            dict of str: list of str:
+                name of the GSVs "added", "removed" and "changed" (nodes,
+                values, locked or type).
+        """
+
+        changed_nodes = set(changed_nodes)
+        # the caches might not have received the events yet
+        Cache.invalidate_all(list(changed_nodes))
+
+        previous_gsvs = OrderedDict((gsv.name, gsv) for gsv in self.gsvs)
+        self.compiled = self.settings.compile()
+
+        # which nodes are logical can depend on parameters
+        affected = None
+        if parameters_only and not self.compiled.mode.startswith("logical"):
+            affected = self.__patch_nodes(changed_nodes)
+        if affected is None:
+            affected = self.__rebuild_nodes(changed_nodes)
+
+        self.global_gsvs = global_gsv_table.get()
+        for gsvname in self.gsv_nodes.keys():
+            gsv = previous_gsvs.get(gsvname)
+            if gsv and gsv.is_global != (gsvname in self.global_gsvs):
+                affected.add(gsvname)
+            continue
+
+        # state of the affected GSVs before the update to find what changed
+        def get_state(gsv_object):
+            return (
+                [gsvnode.node for gsvnode in gsv_object.nodes],
+                gsv_object.values,
+                gsv_object.locked,
+                gsv_object.type
+            )
+
+        before = dict(
+            (gsv.name, get_state(gsv))
+            for gsv in previous_gsvs.values() if gsv.name in affected
+        )
+
+        self.gsvs = list()
+        for gsvname in self.gsv_nodes.keys():
+
+            gsv = previous_gsvs.get(gsvname)
+            if gsv is None or gsvname in affected:
+                gsv = GSVObject(gsvname, self)  # can return None !
+                # gsv might be excluded, so it returns None
+                if not gsv:
+                    continue
+                gsv.build()
+            else:
+                # same result, but must not keep the previous index alive
+                gsv.build(reset=False)
+
+            self.gsvs.append(gsv)
+            continue
+
+        self.gsv_instances = dict((gsv.name, gsv) for gsv in self.gsvs)
+
+        delta = {"added": list(), "removed": list(), "changed": list()}
+        for gsv in self.gsvs:
+            if gsv.name not in previous_gsvs:
+                delta["added"].append(gsv.name)
+            elif gsv.name in before and before[gsv.name] != get_state(gsv):
+                delta["changed"].append(gsv.name)
+        delta["removed"] = [
+            gsvname for gsvname in previous_gsvs
+            if gsvname not in self.gsv_instances
+        ]
+
+        logger.debug(
+            "[GSVScene][update] Finished for {} nodes: {}"
+            "".format(len(changed_nodes), delta)
+        )
+        return delta
+
+    def __rebuild_nodes(self, changed_nodes):
+        """
+        Parse the nodegraph again, reusing the GSVNode of the nodes not
+        changed.
+
+        Args:
+            changed_nodes(set of NodegraphAPI.Node):
+
+        Returns:
+            set of str: name of the GSVs whose nodes might have changed.
+        """
+
+        previous_nodes = self.gsv_nodes
+        extractors = self.compiled.extractors
+        # not cacheable structures can change without an event on their node
+        reused = dict(
+            (gsvnode.node, gsvnode) for gsvnode in self.nodes
+            if gsvnode.node not in changed_nodes
+            and gsvnode.type in extractors and extractors[gsvnode.type][3]
+        )
+        # GSVs used by the changed nodes before the update
+        affected = set()
+        for gsvnode in self.nodes:
+            if gsvnode.node in changed_nodes:
+                affected.update(gsvnode.gsvs.keys())
+
+        self.__build_nodes(reused=reused)
+
+        for gsvname, gsvnodes in self.gsv_nodes.items():
+            if gsvname in affected:
+                continue
+            if gsvnodes != previous_nodes.get(gsvname):
+                affected.add(gsvname)
+            continue
+
+        return affected
+
+    def __patch_nodes(self, changed_nodes):
+        """
+        Read again the given nodes, which must be the only changes in the
+        nodegraph, and only index again the GSVs they use.
+
+        Args:
+            changed_nodes(set of NodegraphAPI.Node):
+
+        Returns:
+            set of str or None:
+                name of the GSVs whose nodes might have changed. None if the
+                scene must be rebuilt instead.
+        """
+
+        # names of nodes without list values are indexed without nodes,
+        # which can't be patched.
+        if self.__irregular:
+            return None
+        # other nodes might have changed too
+        if not all(
+                extractor[3] for extractor in self.compiled.extractors.values()
+        ):
+            return None
+
+        positions = self.__positions
+        changed = sorted(
+            positions[node] for node in changed_nodes if node in positions
+        )
+
+        gsvnodes = [
+            GSVNode(node=self.nodes[position].node, scene=self)
+            for position in changed
+        ]
+        for gsvnode in gsvnodes:
+            for gsvvalues in gsvnode.gsvs.values():
+                if not isinstance(gsvvalues, tuple):
+                    return None
+
+        affected = set()
+        for position, gsvnode in zip(changed, gsvnodes):
+            affected.update(self.nodes[position].gsvs.keys())
+            affected.update(gsvnode.gsvs.keys())
+            self.nodes[position] = gsvnode
+            continue
+
+        # previous GSVObjects still use the previous index
+        gsv_nodes = OrderedDict(self.gsv_nodes)
+        gsv_values = dict(self.gsv_values)
+
+        for gsvname in affected:
+
+            # nodes are kept in the scene order
+            indexes = set(
+                positions[gsvnode.node]
+                for gsvnode in gsv_nodes.get(gsvname, list())
+            )
+            indexes.update(changed)
+            nodes = [
+                self.nodes[index] for index in sorted(indexes)
+                if gsvname in self.nodes[index].gsvs
+            ]
+
+            if not nodes:
+                gsv_nodes.pop(gsvname, None)
+                gsv_values.pop(gsvname, None)
+                continue
+
+            values = OrderedDict()
+            for gsvnode in nodes:
+                for value in gsvnode.gsvs[gsvname]:
+                    values[_intern(str(value))] = None
+
+            gsv_nodes[gsvname] = nodes
+            gsv_values[gsvname] = values
+            continue
+
+        # names are in the order they are first found in the nodes
+        def get_order(gsvname):
+            gsvnode = gsv_nodes[gsvname][0]
+            return (
+                positions[gsvnode.node],
+                list(gsvnode.gsvs.keys()).index(gsvname)
+            )
+
+        self.gsv_nodes = OrderedDict(
+            (gsvname, gsv_nodes[gsvname])
+            for gsvname in sorted(gsv_nodes.keys(), key=get_order)
+        )
+        self.gsv_values = gsv_values
+
+        logger.debug(
+            "[GSVScene][__patch_nodes] Finished for {} nodes, {} gsvs "
+            "affected.".format(len(changed), len(affected))
+        )
+        return affected
+
+    def todict(self, detailed=False):
+        """
+        Args:
+            detailed(bool): see GSVObject.todict
+
+        Returns:
+            dict: {"gsvs": [GSVObject.todict(), ...]}
+        """
+        return {"gsvs": [gsv.todict(detailed) for gsv in self.gsvs]}
+
+    def export(self, file_obj, detailed=False, lines=True):
+        """
+        Write the scene to the given file object, one GSV at a time, so the
+        memory used doesn't depend on the scene size.
+
+        Args:
+            file_obj(file): opened in text mode for writing.
+            detailed(bool): see GSVObject.todict
+            lines(bool):
+                True to write one json GSV record per line (NDJSON), else a
+                single json document with the structure of todict().
+
+        Returns:
+            int: number of GSV written.
+        """
+
+        count = 0
+
+        if not lines:
+            file_obj.write('{"gsvs": [\n')
+
+        for gsv in self.gsvs:
+
+            record = json.dumps(gsv.todict(detailed), sort_keys=True)
+            if lines:
+                file_obj.write(record + "\n")
+            else:
+                file_obj.write((",\n" if count else "") + record)
+
+            count += 1
+            continue
+
+        if not lines:
+            file_obj.write("\n]}\n")
+
+        logger.debug(
+            "[GSVScene][export] Finished. {} gsv written.".format(count)
+        )
+        return count
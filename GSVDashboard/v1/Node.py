@@ -37,6 +37,7 @@ from Katana import (
 import PackageSuperToolAPI
 
 from . import c
+from . import Cache
 from . import config
 from . import GSV
 from . import EditorResources as resources
@@ -132,6 +133,8 @@ class GSVDashboardNode(NodegraphAPI.SuperTool):
                 <li><code>&lt;logical_upstream&gt;</code> : only process nodes that contribute to building the scene and are connected to this node.</li>
                 <li><code>&lt;all_scene&gt;</code> : all nodes in the scene, no matter if they are connected or not.</li>
                 <li><code>&lt;upstream&gt;</code> : all nodes upstream of this node no matter if they contribute to the scene or not.</li>
+                <li><code>&lt;logical_downstream&gt;</code> : only process nodes that contribute to building the scene and are connected to the outputs of this node.</li>
+                <li><code>&lt;downstream&gt;</code> : all nodes downstream of this node no matter if they contribute to the scene or not.</li>
                 </ul>
                 <p><br /><br /></p>
             """
@@ -302,6 +305,9 @@ class GSVDashboardNode(NodegraphAPI.SuperTool):
             node.setName("VariableSet_{}_{}".format(name, value))
             self.__build_internal_network()
 
+        # results are usually needed before the events are received
+        Cache.invalidate_all([self] + self.getChildren())
+
         logger.debug(
             "[GSVDashboardNode][edit_gsv] Finished with name<{}>, value<{}>"
             "".format(name, value)
@@ -356,6 +362,9 @@ class GSVDashboardNode(NodegraphAPI.SuperTool):
             node.delete()
             self.__build_internal_network()
 
+        # results are usually needed before the events are received
+        Cache.invalidate_all([self, node] + self.getChildren())
+
         logger.debug(
             "[GSVDashboardNode][unedit_gsv] Finished with name<{}>."
             "".format(name)
@@ -581,7 +590,7 @@ class SuperToolGSV(object):
             list of str:
                 List of values the GSV can take.
         """
-        return self.__data.values
+        return list(self.__data.values)
 
     def get_nodes(self):
         """
@@ -590,7 +599,7 @@ class SuperToolGSV(object):
                 List of nodes that are using this GSV. List content depends
                     of parsing settings passed to the super-tool.
         """
-        return self.__data.nodes
+        return list(self.__data.nodes)
 
     def set_edit_node(self, node):
         """
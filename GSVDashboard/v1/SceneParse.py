@@ -17,8 +17,12 @@
     limitations under the License.
 
 """
+import copy
+
 import NodegraphAPI
 
+from . import Cache
+
 # error on Python2, for comments only anyway
 try:
     from typing import Tuple, Optional
@@ -27,7 +31,13 @@ except ImportError:
 
 __all__ = [
     "SceneParser",
-    "ParseSettings"
+    "ParseSettings",
+    "GraphIndex",
+    "graph_index",
+    "GroupIndex",
+    "group_index",
+    "GraphStateCache",
+    "graph_state_cache",
 ]
 
 
@@ -46,6 +56,28 @@ class ParseSettings(dict):
     [logical](bool):
         True to process only logical connections between nodes.
         (ex: Switch node only have 1 logical connection)
+    [emit_types](list of str or None):
+        Only output nodes of these types, None to output all nodes. Other
+        nodes are still visited.
+    [stop_types](list of str):
+        Nodes of these types are output but the parsing doesn't continue
+        upstream of them (groups of these types are not visited).
+    [stop_names](list of str):
+        Same as ``stop_types`` but for node names.
+    [max_depth](int or None):
+        Maximum number of connections followed from the source, going inside
+        a group counting as one. None for no limit.
+    [scope](str or None):
+        Name of a GroupNode the parsing must stay inside : only the source and
+        the nodes inside the group (at any level) are visited. None to parse
+        the whole nodegraph.
+    [downstream](bool):
+        True to find the nodes connected to the source outputs instead of its
+        inputs. Groups are handled the same way, entering them from their
+        input ports and leaving them from their output ports.
+
+    Every key after ``logical`` is optional when passing a dict, the default
+    value is used if missing. Lists also accept a set or a tuple.
     """
 
     __default = {
@@ -53,15 +85,35 @@ class ParseSettings(dict):
         "excluded": {
             "asGroupsNodeType": []
         },
-        "logical": True
+        "logical": True,
+        "emit_types": None,
+        "stop_types": [],
+        "stop_names": [],
+        "max_depth": None,
+        "scope": None,
+        "downstream": False,
     }
 
+    __optional = (
+        "emit_types",
+        "stop_types",
+        "stop_names",
+        "max_depth",
+        "scope",
+        "downstream",
+    )
+
     def __init__(self, *args, **kwargs):
 
         if not args and not kwargs:
-            super(ParseSettings, self).__init__(self.__default)
+            super(ParseSettings, self).__init__(copy.deepcopy(self.__default))
         else:
             super(ParseSettings, self).__init__(*args, **kwargs)
+            for key in self.__optional:
+                if key not in self:
+                    dict.__setitem__(
+                        self, key, copy.deepcopy(self.__default[key])
+                    )
             self.validate()
 
         return
@@ -96,6 +148,54 @@ class ParseSettings(dict):
     def include_groups(self, include_groups_value):
         self["include_groups"] = include_groups_value
 
+    @property
+    def emit_types(self):
+        return self["emit_types"]
+
+    @emit_types.setter
+    def emit_types(self, emit_types_value):
+        self["emit_types"] = emit_types_value
+
+    @property
+    def stop_types(self):
+        return self["stop_types"]
+
+    @stop_types.setter
+    def stop_types(self, stop_types_value):
+        self["stop_types"] = stop_types_value
+
+    @property
+    def stop_names(self):
+        return self["stop_names"]
+
+    @stop_names.setter
+    def stop_names(self, stop_names_value):
+        self["stop_names"] = stop_names_value
+
+    @property
+    def max_depth(self):
+        return self["max_depth"]
+
+    @max_depth.setter
+    def max_depth(self, max_depth_value):
+        self["max_depth"] = max_depth_value
+
+    @property
+    def scope(self):
+        return self["scope"]
+
+    @scope.setter
+    def scope(self, scope_value):
+        self["scope"] = scope_value
+
+    @property
+    def downstream(self):
+        return self["downstream"]
+
+    @downstream.setter
+    def downstream(self, downstream_value):
+        self["downstream"] = downstream_value
+
     def validate(self):
         """
         Raises:
@@ -115,6 +215,30 @@ class ParseSettings(dict):
         assert isinstance(self.get("include_groups"), bool),\
             pre + "Missing key <include_groups> or value is not <bool>."
 
+        assert self.get("emit_types") is None or isinstance(
+            self["emit_types"], (list, tuple, set, frozenset)
+        ), pre + "Value for key <emit_types> is not None or a list."
+
+        assert isinstance(
+            self.get("stop_types"), (list, tuple, set, frozenset)
+        ), pre + "Missing key <stop_types> or value is not a list."
+
+        assert isinstance(
+            self.get("stop_names"), (list, tuple, set, frozenset)
+        ), pre + "Missing key <stop_names> or value is not a list."
+
+        max_depth = self.get("max_depth")
+        assert max_depth is None or (
+            isinstance(max_depth, int) and max_depth >= 0
+        ), pre + "Value for key <max_depth> is not None or a positive int."
+
+        assert self.get("scope") is None or isinstance(
+            self["scope"], (str, type(u""))
+        ), pre + "Value for key <scope> is not None or a str."
+
+        assert isinstance(self.get("downstream"), bool),\
+            pre + "Missing key <downstream> or value is not <bool>."
+
         return
 
 
@@ -122,184 +246,1212 @@ class SceneParser(object):
     """
     Attributes:
 
-        __buffer(set of NodegraphAPI.Node):
-            list of visited node in "pseudo-order" after a parsing operation.
-            Must be returned by the parsing function and reset after.
+        __buffer(list of NodegraphAPI.Node):
+            list of visited node in "pseudo-order" not yielded yet, or still
+            needed to record the parsing result of a group.
+            Reset after each parsing.
+
+        __visited(dict of NodegraphAPI.Node: int):
+            same nodes as in the buffer but as a dict so membership tests stay
+            O(1) while the buffer is growing. Values are the order in which
+            the nodes were first visited.
 
-        visited_ports (list of NodegraphAPI.Port):
-            we keep a list of the port we progressively visit to avoid visiting
+        visited_ports (set of NodegraphAPI.Port):
+            we keep a set of the port we progressively visit to avoid visiting
             them multiples times.
 
         settings(ParseSettings):
             Options for the scene parsing
+
+        index(GraphIndex):
+            where the nodes connections, in both directions, are queried from.
+
+        group_index(GroupIndex):
+            where the result of the parsing inside groups is stored/reused.
+            Ports visited inside a reused group are not in ``visited_ports``.
+
+        graph_states(GraphStateCache):
+            where the GraphState of nodes is queried from for logical parsing.
+
+        __recording(dict of NodegraphAPI.GroupNode: set of str):
+            groups whose content is being parsed to be stored in the
+            group_index, with the name of the input ports the parsing leaved
+            the group from.
+
+        __records(list of list):
+            [group, visit order when entered, is valid] for each group whose
+            parsing result is being recorded, from the outer-most to the
+            inner-most.
+
+        __subtrees(dict or None):
+            {(group, output port name): tuple of nodes} whole result of the
+            parsing from a group output port. Only used during a
+            get_upstream_nodes_many call where the nodegraph can't change,
+            None else.
+
+        __depths(dict of NodegraphAPI.Node or tuple: int):
+            smallest depth each node was visited at, only used with
+            settings.max_depth. Downstream, groups reached from an input are
+            stored by (group, input port name), see __get_input_key.
+
+        __entered(dict of NodegraphAPI.GroupNode: NodegraphAPI.Port or None):
+            port each group was first reached from, only used with
+            settings.max_depth when not downstream.
+
+        __entered_inputs(set of tuple):
+            (group, input port name) the parsing already went inside the
+            group from, only used when settings.downstream.
+
+        __scope(NodegraphAPI.GroupNode or None):
+            resolved settings.scope
+
+        __scoped(dict of NodegraphAPI.Node: bool):
+            memoized result of __in_scope
     """
 
+    # kind of work items that can be found in the stack
+    # (see __get_upstream_nodes)
+    __visit = 0
+    __ports = 1
+    __group_exit = 2
+    __group_record = 3
+    __subtree_record = 4
+
     def __init__(self, source=None):
 
         self.source = source
         self.__buffer = list()
+        self.__visited = dict()
+        self.visited_ports = set()
         self.settings = ParseSettings()
+        self.index = graph_index
+        self.group_index = group_index
+        self.graph_states = graph_state_cache
+        self.__recording = dict()
+        self.__records = list()
+        self.__subtrees = None
+        self.__depths = dict()
+        self.__entered = dict()
+        self.__entered_inputs = set()
+        self.__scope = None
+        self.__scoped = dict()
 
         return
 
-    def __get_upstream_nodes(self, source, grp_node=None):
+    def __add_to_buffer(self, node):
+        """
+        Args:
+            node(NodegraphAPI.Node): node to add to the output.
+        """
+        self.__buffer.append(node)
+        if node in self.__visited:
+            self.__touch(node)
+        else:
+            self.__visited[node] = len(self.__visited)
+        return
+
+    def __touch(self, node):
+        """
+        Called when the parsing depends on the given node being already
+        visited. If it was visited before entering a group being recorded,
+        the content of the group depends on what was parsed before it and can
+        not be reused.
+
+        Args:
+            node(NodegraphAPI.Node): an already visited node
+        """
+        order = self.__visited[node]
+        for record in reversed(self.__records):
+            if record[1] <= order:
+                break
+            record[2] = False
+        return
+
+    def __set_scope(self, source):
+        """
+        Resolve settings.scope for the parsing starting at the given source.
+
+        Args:
+            source(NodegraphAPI.Node or NodegraphAPI.Port):
+        """
+        if self.settings.scope is None:
+            self.__scope = None
+            return
+
+        scope = NodegraphAPI.GetNode(self.settings.scope)
+        if not isinstance(scope, NodegraphAPI.GroupNode):
+            raise ValueError(
+                "[__set_scope] Scope <{}> is not the name of an existing "
+                "GroupNode.".format(self.settings.scope)
+            )
+
+        self.__scope = scope
+        if isinstance(source, NodegraphAPI.Port):
+            source = source.getNode()
+        # the source is always visited
+        self.__scoped = {source: True}
+        return
+
+    def __in_scope(self, node):
+        """
+        Args:
+            node(NodegraphAPI.Node):
+
+        Returns:
+            bool: True if the node is inside the scope group (at any level).
+        """
+        in_scope = self.__scoped.get(node)
+        if in_scope is not None:
+            return in_scope
+
+        parent = node.getParent()
+        if parent is None:
+            in_scope = False
+        elif parent == self.__scope:
+            in_scope = True
+        else:
+            in_scope = self.__in_scope(parent)
+
+        self.__scoped[node] = in_scope
+        return in_scope
+
+    def __get_upstream_nodes(self, source):
         """
         From a given node, find all upstream nodes connected.
 
         Groups node themself are not included in the output but their children are
         processed (unless contrary specified in settings).
 
+        The graph is walked depth-first using an explicit stack instead of
+        recursion so the depth of the nodegraph is not limited by Python's
+        recursion limit. The stack hold 5 kind of work items :
+
+        - ``(__visit, source, grp_node, depth)`` : a node/port to process.
+        - ``(__ports, iterator, grp_node, depth)`` : connected ports of a node
+          that are still to process. Put back on the stack every time one of
+          its port is processed so the upstream of the port is fully processed
+          before the next port is checked.
+        - ``(__group_exit, group_node, depth)`` : the content of the group has
+          been processed, continue with the inputs of the group.
+        - ``(__group_record, group_node, key, buffer_start)`` :
+          the content of the group has been processed, store it in the
+          group_index.
+        - ``(__subtree_record, group_node, port_name, buffer_start)`` :
+          the group and all its upstream has been processed, store it in
+          __subtrees.
+
+        Nodes are yielded as soon as they are added to the buffer (if their
+        type is in settings.emit_types). The buffer is then emptied unless a
+        group parsing result is being recorded.
+
+        With settings.max_depth, a node reached again with a smaller depth
+        has its connections processed again (but is not output twice), so the
+        result doesn't depend on the order connections are processed in.
+
+        Downstream, a group is entered again from each of its inputs it is
+        reached from, as each input only leads to the nodes connected inside
+        to it.
+
         Args:
-            grp_node (NodegraphAPI.GroupNode or None): GroupNode the source might belongs to.
             source(NodegraphAPI.Node or NodegraphAPI.Port):
                 object to start the parsing from.
 
-        Returns:
-            None:
+        Yields:
+            NodegraphAPI.Node: visited node in "pseudo-order"
         """
 
-        # we always have at least source_node != None
-        if isinstance(source, NodegraphAPI.Port):
-            source_port = source
-            source_node = source.getNode()
-        elif isinstance(source, NodegraphAPI.Node):
-            source_port = None
-            source_node = source
-        else:
-            raise TypeError(
-                "Submited source argument <{}> is not supported."
-                "Must be Port or Node."
-                "".format(source)
-            )
+        # parsing inside groups can only be reused if not logical, as which
+        # connections are logical also depends on what's upstream the group.
+        # the content of groups also depends on the depth they are entered at
+        downstream = self.settings.downstream
+        max_depth = self.settings.max_depth
+        record_groups = (
+            self.group_index.is_live
+            and not self.settings.logical
+            and not downstream
+            and max_depth is None
+        )
+        use_subtrees = self.__subtrees is not None and max_depth is None
+        emit_types = self.settings.emit_types
+        if emit_types is not None:
+            emit_types = frozenset(emit_types)
+        stop_types = frozenset(self.settings.stop_types)
+        stop_names = frozenset(self.settings.stop_names)
+        excluded_groups = frozenset(self.settings.exluded_asGroupsNodeType)
+        if self.settings.logical:
+            self.graph_states.begin()
+        self.__set_scope(source)
+        scope = self.__scope
+
+        stack = [(self.__visit, source, None, 0)]
+        # index in the buffer of the next node to yield
+        emitted = 0
+
+        while stack:
+
+            # yield what the previous work item added
+            while emitted < len(self.__buffer):
+                node = self.__buffer[emitted]
+                emitted += 1
+                if emit_types is None or node.getType() in emit_types:
+                    yield node
+            # buffer slices are only needed while recording
+            if emitted and not self.__records:
+                del self.__buffer[:]
+                emitted = 0
+
+            work_item = stack.pop()
+
+            if work_item[0] == self.__ports:
+
+                connected_ports = work_item[1]
+                grp_node = work_item[2]
+                depth = work_item[3] + 1
+
+                for connected_port in connected_ports:
+
+                    connected_node = connected_port.getNode()
+                    # inside a group, the only port on the group is a send one
+                    if connected_node in self.__recording:
+                        self.__recording[connected_node].add(
+                            connected_port.getName()
+                        )
+
+                    # a group is parsed once from each of its inputs
+                    input_key = downstream and self.__get_input_key(
+                        connected_port, excluded_groups
+                    )
+                    if input_key:
+                        visited = input_key in self.__entered_inputs
+                    else:
+                        visited = connected_node in self.__visited
+
+                    # avoid processing multiples times the same node/port
+                    if visited:
+                        if self.__records and connected_node in self.__visited:
+                            self.__touch(connected_node)
+                        if max_depth is None or depth >= self.__depths.get(
+                                input_key or connected_node, -1
+                        ):
+                            continue
+
+                    # come back to the remaining ports once this one is done
+                    stack.append(work_item)
+                    stack.append(
+                        (self.__visit, connected_port, grp_node, depth)
+                    )
+                    break
 
-        # We are goint out of a group, its potential inputs have all already
-        # been processed.
-        if grp_node == source_node:
-            if self.settings.include_groups:
-                self.__buffer.append(source_node)
-            return
+                continue
 
-        # When we got a groupNode we need to also parse what's inside (unless
-        # the node it is excluded). To do so we swap the passed inputPort/node
-        # of the group by the ones from the first children in the group.
-        # (i): We reach this only when going in a group.
-        if isinstance(
-            source_node,
-            NodegraphAPI.GroupNode
-        ) and (
-            source_node.getType() not in self.settings.exluded_asGroupsNodeType
-        ):
-
-            # if we passed a port we can just find what child node is connected
-            if source_port:
-                # at first we assume we a going inside the group = return port
-                __port = source_node.getReturnPort(source_port.getName())
-                if not __port:
-                    raise RuntimeError(
-                        "[__get_upstream_nodes][is grp] No Return port found"
-                        "  on node <{}> with source port <{}>."
-                        " This should not happens ?!"
-                        "".format(source_node, source_port)
-                    )
+            if work_item[0] == self.__group_exit:
+
+                grp_node = work_item[1]
+                # we continue by finding connections on the group, if it
+                # doesn't have inputs we have already visited it's content.
+                self.__stack_connections(
+                    stack, grp_node, grp_node, work_item[2]
+                )
+
+                continue
+
+            if work_item[0] == self.__group_record:
+
+                self.__record_group(*work_item[1:])
+                continue
 
-                source_port = __port.getConnectedPorts()[0]
-                # instead of continuing we parse directly the upstream node
-                # of the connected output node. Not returning would create an
-                # issue when 2 grp are connected and the top one doesnt have inputs.
+            if work_item[0] == self.__subtree_record:
 
+                self.__record_subtree(*work_item[1:])
+                continue
+
+            source = work_item[1]
+            grp_node = work_item[2]
+            depth = work_item[3]
+
+            # we always have at least source_node != None
+            if isinstance(source, NodegraphAPI.Port):
+                source_port = source
+                source_node = source.getNode()
+                self.visited_ports.add(source_port)
+            elif isinstance(source, NodegraphAPI.Node):
+                source_port = None
+                source_node = source
             else:
-                # if no port supplied we assume the group only have one output
-                source_port = source_node.getOutputPortByIndex(0)
-                # and if he doesn't even have an output port ...
-                if not source_port:
-                    raise TypeError(
-                        "The given source_obj[0] is a GroupNode with no output "
-                        "port which is not currently supported."
+                raise TypeError(
+                    "Submited source argument <{}> is not supported."
+                    "Must be Port or Node."
+                    "".format(source)
+                )
+
+            # We are goint out of a group, its potential inputs have all already
+            # been processed.
+            if grp_node == source_node:
+                if self.settings.include_groups:
+                    self.__add_to_buffer(source_node)
+                continue
+
+            if scope is not None and not self.__in_scope(source_node):
+                continue
+
+            # when reached again with a smaller depth we only need to process
+            # its connections again.
+            revisit = False
+            if max_depth is not None:
+                if depth > max_depth:
+                    continue
+                depth_key = source_node
+                if downstream and source_port is not None:
+                    depth_key = self.__get_input_key(
+                        source_port, excluded_groups
+                    ) or source_node
+                previous_depth = self.__depths.get(depth_key)
+                if previous_depth is not None:
+                    if previous_depth <= depth:
+                        continue
+                    revisit = True
+                self.__depths[depth_key] = depth
+
+            # The source is inside a group and we reached the group from its
+            # return port: going out of it without having entered it.
+            if downstream and source_port is not None and isinstance(
+                source_node, NodegraphAPI.GroupNode
+            ) and source_port == source_node.getReturnPort(
+                source_port.getName()
+            ):
+                if self.settings.include_groups and not revisit:
+                    self.__add_to_buffer(source_node)
+                self.__stack_connections(stack, source_node, grp_node, depth)
+                continue
+
+            # boundary: nothing upstream of this node, even inside, is parsed.
+            if (stop_types and source_node.getType() in stop_types) or (
+                stop_names and source_node.getName() in stop_names
+            ):
+                if not revisit and (
+                    self.settings.include_groups or not isinstance(
+                        source_node, NodegraphAPI.GroupNode
                     )
-                source_port = source_node.getReturnPort(source_port.getName())
-                source_port = source_port.getConnectedPorts()[0]
-                # make sure that if the new node is a group, it is properly
-                # parsed too.
-
-            # the group is added first in the buffer
-            if self.settings.include_groups:
-                self.__buffer.append(source_node)
-            # now parse the node inside the group starting by the
-            # most downstream one we found
-            self.__get_upstream_nodes(source_port, grp_node=source_node)
-            if source_node.getInputPorts():
-                grp_node = source_node
-                # we continue the method, by finding connections on the group
-                pass
-            else:
-                # we have already visited it's content so stop here
-                return
+                ):
+                    self.__add_to_buffer(source_node)
+                continue
+
+            # When we got a groupNode we need to also parse what's inside (unless
+            # the node it is excluded). To do so we swap the passed inputPort/node
+            # of the group by the ones from the first children in the group.
+            # (i): We reach this only when going in a group.
+            if isinstance(
+                source_node,
+                NodegraphAPI.GroupNode
+            ) and (
+                source_node.getType() not in excluded_groups
+            ):
+
+                # upstream, a group is always parsed from the port it was
+                # first reached. Downstream each input is parsed on its own.
+                if not downstream:
+                    if revisit:
+                        source_port = self.__entered[source_node]
+                    elif max_depth is not None:
+                        self.__entered[source_node] = source_port
+
+                port_name = self.__get_group_port_name(
+                    source_node, source_port, downstream
+                )
+
+                # whole upstream already parsed in this batch
+                if use_subtrees and self.__replay(
+                    self.__subtrees.get((source_node, port_name))
+                ):
+                    continue
+
+                if use_subtrees:
+                    self.__records.append(
+                        [source_node, len(self.__visited), True]
+                    )
+                    stack.append((
+                        self.__subtree_record,
+                        source_node,
+                        port_name,
+                        len(self.__buffer)
+                    ))
+
+                key = None
+                if record_groups:
+                    key = self.group_index.get_key(port_name, self.settings)
+                    # content already known, no need to go inside
+                    summary = self.group_index.get(source_node, key)
+                    if summary and self.__replay(summary[0], source_node):
+                        stack.append((self.__group_exit, source_node, depth))
+                        continue
+
+                if downstream:
+                    self.__entered_inputs.add((source_node, port_name))
+                    # the group is added first in the buffer, the first time
+                    # one of its inputs is reached.
+                    if source_node in self.__visited:
+                        if self.__records:
+                            self.__touch(source_node)
+                    elif self.settings.include_groups:
+                        self.__add_to_buffer(source_node)
+                    # parse the nodes connected inside to the input port we
+                    # come from, then the nodes connected to the outputs.
+                    stack.append((self.__group_exit, source_node, depth))
+                    entry_ports = self.__get_group_entries(
+                        source_node, source_port
+                    )
+                    if entry_ports:
+                        stack.append((
+                            self.__ports,
+                            iter(entry_ports),
+                            source_node,
+                            depth
+                        ))
+                    continue
+
+                source_port = self.__get_group_entry(source_node, source_port)
+                visited_start = len(self.__visited)
+
+                # the group is added first in the buffer
+                if self.settings.include_groups and not revisit:
+                    self.__add_to_buffer(source_node)
+                # now parse the node inside the group starting by the
+                # most downstream one we found, then the group inputs.
+                stack.append((self.__group_exit, source_node, depth))
+                if key:
+                    self.__recording.setdefault(source_node, set())
+                    self.__records.append([source_node, visited_start, True])
+                    stack.append((
+                        self.__group_record,
+                        source_node,
+                        key,
+                        len(self.__buffer)
+                    ))
+                stack.append(
+                    (self.__visit, source_port, source_node, depth + 1)
+                )
+                continue
 
-        else:
             # as not a grp, add to the buffer (grp have already been added)
-            self.__buffer.append(source_node)
+            if not revisit:
+                self.__add_to_buffer(source_node)
+            self.__stack_connections(stack, source_node, grp_node, depth)
+
+            continue
+
+        for node in self.__buffer[emitted:]:
+            if emit_types is None or node.getType() in emit_types:
+                yield node
+
+        return
+
+    def __replay(self, nodes, grp_node=None):
+        """
+        Add a recorded parsing result to the buffer instead of parsing it.
+
+        Args:
+            nodes(tuple of NodegraphAPI.Node or None): recorded result
+            grp_node(NodegraphAPI.GroupNode or None):
+                if the nodes are the content of a group, the group to add
+                first (if include_groups)
+
+        Returns:
+            bool: False if nothing was added and the parsing has to be done.
+        """
+        if nodes is None:
+            return False
+
+        # the result was recorded with none of its nodes already visited
+        for node in nodes:
+            if node in self.__visited:
+                return False
+
+        if grp_node is not None and self.settings.include_groups:
+            self.__add_to_buffer(grp_node)
+        for node in nodes:
+            self.__add_to_buffer(node)
+
+        return True
+
+    def __record_group(self, grp_node, key, buffer_start):
+        """
+        Store the content of the group just parsed in the group_index.
+
+        Args:
+            grp_node(NodegraphAPI.GroupNode):
+            key(tuple): see GroupIndex.get_key
+            buffer_start(int): size of the buffer when the group was entered.
+        """
+        exits = self.__recording.pop(grp_node, set())
+        record = self.__records.pop()
+
+        # result depends on what was parsed before the group (see __touch)
+        if not record[2]:
+            return
+
+        self.group_index.set(grp_node, key, self.__buffer[buffer_start:], exits)
+        return
+
+    def __record_subtree(self, grp_node, port_name, buffer_start):
+        """
+        Store the result of the parsing started from the given group output
+        port in __subtrees.
+
+        Args:
+            grp_node(NodegraphAPI.GroupNode):
+            port_name(str or None): name of the group output port
+            buffer_start(int): size of the buffer when the group was visited.
+        """
+        record = self.__records.pop()
+
+        # result depends on what was parsed before the group (see __touch)
+        if not record[2]:
+            return
 
+        self.__subtrees[(grp_node, port_name)] = tuple(
+            self.__buffer[buffer_start:]
+        )
+        return
+
+    @staticmethod
+    def __get_group_port_name(grp_node, source_port=None, downstream=False):
+        """
+        Args:
+            grp_node(NodegraphAPI.GroupNode):
+            source_port(NodegraphAPI.Port or None):
+                port of the group we are coming from. If None we assume
+                the group only have one output (or input if downstream).
+            downstream(bool): True if the parsing is downstream.
+
+        Returns:
+            str or None: name of the port the group is parsed from.
+        """
+        if source_port:
+            return source_port.getName()
+
+        if downstream:
+            source_port = grp_node.getInputPortByIndex(0)
+        else:
+            source_port = grp_node.getOutputPortByIndex(0)
+        return source_port.getName() if source_port else None
+
+    def __stack_connections(self, stack, node, grp_node, depth):
+        """
+        Add the ports connected to the given node's inputs (or outputs if
+        downstream) to the stack.
+
+        Args:
+            stack(list): stack used by __get_upstream_nodes
+            node(NodegraphAPI.Node): node to find the connections of.
+            grp_node(NodegraphAPI.GroupNode or None):
+                GroupNode the connected nodes might belongs to.
+            depth(int): depth the node was visited at.
+        """
         # We need to find a list of port connected to this node
         connected_ports = node_get_connections(
-            node=source_node,
-            logical=self.settings.logical
+            node=node,
+            logical=self.settings.logical,
+            index=self.index,
+            graph_states=self.graph_states,
+            downstream=self.settings.downstream
         )
-        # Node doesn't have any inputs so return.
-        if not connected_ports:
-            return
+        # Node doesn't have any inputs so nothing to add.
+        if connected_ports:
+            stack.append(
+                (self.__ports, iter(connected_ports), grp_node, depth)
+            )
 
-        # now process all the input of this node
-        for connected_port in connected_ports:
+        return
 
-            # avoid processing multiples times the same node/port
-            if connected_port.getNode() in self.__buffer:
-                continue
+    @staticmethod
+    def __get_group_entry(grp_node, source_port=None):
+        """
+        Find the port, inside the group, to continue the parsing from.
+
+        Args:
+            grp_node(NodegraphAPI.GroupNode):
+            source_port(NodegraphAPI.Port or None):
+                output port of the group we are coming from. If None we assume
+                the group only have one output.
+
+        Returns:
+            NodegraphAPI.Port:
+        """
 
-            self.__get_upstream_nodes(
-                source=connected_port,
-                grp_node=grp_node
+        # if we passed a port we can just find what child node is connected
+        if source_port:
+            # at first we assume we a going inside the group = return port
+            __port = grp_node.getReturnPort(source_port.getName())
+            if not __port:
+                raise RuntimeError(
+                    "[__get_upstream_nodes][is grp] No Return port found"
+                    "  on node <{}> with source port <{}>."
+                    " This should not happens ?!"
+                    "".format(grp_node, source_port)
+                )
+
+            # instead of continuing we parse directly the upstream node
+            # of the connected output node. Not returning would create an
+            # issue when 2 grp are connected and the top one doesnt have inputs.
+            return __port.getConnectedPorts()[0]
+
+        # if no port supplied we assume the group only have one output
+        source_port = grp_node.getOutputPortByIndex(0)
+        # and if he doesn't even have an output port ...
+        if not source_port:
+            raise TypeError(
+                "The given source_obj[0] is a GroupNode with no output "
+                "port which is not currently supported."
             )
+        source_port = grp_node.getReturnPort(source_port.getName())
+        # make sure that if the new node is a group, it is properly
+        # parsed too.
+        return source_port.getConnectedPorts()[0]
 
-            continue
+    @staticmethod
+    def __get_input_key(port, excluded_groups):
+        """
+        Args:
+            port(NodegraphAPI.Port): port a node is reached from, downstream.
+            excluded_groups(frozenset of str):
+                settings.exluded_asGroupsNodeType
 
-        return
+        Returns:
+            tuple or None:
+                (group, input port name) if the port is an input of a group
+                whose content is parsed, None else.
+        """
+        node = port.getNode()
+        if not isinstance(node, NodegraphAPI.GroupNode):
+            return None
+        if node.getType() in excluded_groups:
+            return None
+        # reached from inside the group
+        if port == node.getReturnPort(port.getName()):
+            return None
+        return node, port.getName()
+
+    @staticmethod
+    def __get_group_entries(grp_node, source_port=None):
+        """
+        Downstream version of ``__get_group_entry``.
+
+        Args:
+            grp_node(NodegraphAPI.GroupNode):
+            source_port(NodegraphAPI.Port or None):
+                input port of the group we are coming from. If None we assume
+                the group only have one input.
+
+        Returns:
+            list of NodegraphAPI.Port:
+                input ports inside the group connected to the given input
+                port, can be empty.
+        """
+
+        if not source_port:
+            source_port = grp_node.getInputPortByIndex(0)
+            # nothing inside can be connected to the outside
+            if not source_port:
+                return list()
+
+        send_port = grp_node.getSendPort(source_port.getName())
+        if not send_port:
+            raise RuntimeError(
+                "[__get_upstream_nodes][is grp] No Send port found"
+                "  on node <{}> with source port <{}>."
+                " This should not happens ?!"
+                "".format(grp_node, source_port)
+            )
+
+        return send_port.getConnectedPorts()
 
     def __reset(self):
         """
         Operations done after a parsing to reset the instance before the next
         parsing.
         """
-        self.visited_ports = list()
+        self.__buffer = list()
+        self.__visited = dict()
+        self.visited_ports = set()
         self.settings = ParseSettings()
+        self.__recording = dict()
+        self.__records = list()
+        self.__depths = dict()
+        self.__entered = dict()
+        self.__entered_inputs = set()
+        self.__scope = None
+        self.__scoped = dict()
         return
 
-    def get_upstream_nodes(self, source=None):
+    def iter_upstream_nodes(self, source=None):
         """
-        Make sure the settings attributes is set accordingly before calling.
+        Generator version of ``get_upstream_nodes``: nodes are yielded in the
+        same order as soon as they are found, so the parsing can be stopped
+        early by the caller.
+
+        Downstream nodes are yielded instead if ``settings.downstream``.
+
+        Make sure the settings attributes is set accordingly before iterating.
+        The instance must not be used for another parsing until the generator
+        is exhausted or closed.
 
         Args:
             source(NodegraphAPI.Node or NodegraphAPI.Port):
                 source nodegraph object from where to start the upstream parsing
 
-        Returns:
-            set of NodegraphAPI.Node:
+        Yields:
+            NodegraphAPI.Node:
         """
         source = source or self.source
         if not source:
             raise ValueError(
-                "[get_upstream_nodes] Source argument is nul. Set the class "
+                "[iter_upstream_nodes] Source argument is nul. Set the class "
                 "source attribute or pass a source argument to this method."
             )
-        self.__get_upstream_nodes(source=source)
-        out = self.__buffer  # save the buffer before reseting it
-        self.__reset()
 
-        return out
+        try:
+            for node in self.__get_upstream_nodes(source=source):
+                yield node
+        finally:
+            self.__reset()
+
+        return
+
+    def get_upstream_nodes(self, source=None):
+        """
+        Make sure the settings attributes is set accordingly before calling.
+
+        Args:
+            source(NodegraphAPI.Node or NodegraphAPI.Port):
+                source nodegraph object from where to start the upstream parsing
+
+        Returns:
+            list of NodegraphAPI.Node:
+        """
+        return list(self.iter_upstream_nodes(source))
+
+    def get_upstream_nodes_many(self, sources):
+        """
+        Same as calling ``get_upstream_nodes`` for each source but the part of
+        the nodegraph shared by the sources is only parsed once.
+
+        The nodegraph is considered as not modified during the call : nodes
+        connections and GraphState are only queried once, and the result of
+        the parsing from GroupNodes (like GSVDashboard nodes) is directly
+        reused when another source, or the group itself, reaches it again.
+
+        Args:
+            sources(list of NodegraphAPI.Node or NodegraphAPI.Port):
+                source nodegraph objects from where to start the upstream
+                parsing
+
+        Returns:
+            list of list of NodegraphAPI.Node:
+                result for each source, in the sources order.
+        """
+        settings = self.settings
+        # the nodegraph can't change during the call, so the caches are valid
+        caches = (self.index, self.group_index, self.graph_states)
+        for cache in caches:
+            cache.hold(True)
+
+        self.__subtrees = dict()
+        results = dict()
+        output = list()
+
+        try:
+
+            for source in sources:
+
+                if source not in results:
+                    # settings are reset after each parsing
+                    self.settings = ParseSettings(copy.deepcopy(dict(settings)))
+                    results[source] = self.get_upstream_nodes(source)
+
+                output.append(list(results[source]))
+                continue
+
+        finally:
+            self.__subtrees = None
+            for cache in caches:
+                cache.hold(False)
+
+        return output
+
+
+class GraphIndex(Cache.EventCache):
+    """
+    Adjacency of the nodegraph kept in memory between parsing.
+
+    For every node queried, the ports connected to its inputs (or outputs for
+    the reverse edges used by downstream parsing) are stored so the next
+    parsing doesn't have to query them again from the nodegraph.
+    The entries of a node are dropped when a connection event is received for
+    it, and are built back on the next query.
+
+    The index is only used while it's live (see Cache.EventCache), the
+    nodegraph is queried directly else.
+
+    Attributes:
+        __connections(dict of NodegraphAPI.Node: tuple of NodegraphAPI.Port):
+            output ports connected to the node's input ports, in input order.
+        __reverse(dict of NodegraphAPI.Node: tuple of NodegraphAPI.Port):
+            input ports connected to the node's output ports, in output order.
+    """
+
+    events = (
+        "port_connect",
+        "port_disconnect",
+        "node_create",
+        "node_delete",
+    )
+
+    def __init__(self):
+
+        super(GraphIndex, self).__init__()
+        self.__connections = dict()
+        self.__reverse = dict()
+
+        return
+
+    def __len__(self):
+        return len(self.__connections)
+
+    def get_connections(self, node):
+        """
+        Args:
+            node(NodegraphAPI.Node):
+
+        Returns:
+            tuple of NodegraphAPI.Port:
+                output ports connected to the node's input ports, in input
+                ports order.
+        """
+        if not self.is_live:
+            return node_get_input_connections(node)
+
+        connections = self.__connections.get(node)
+        if connections is None:
+            connections = node_get_input_connections(node)
+            self.__connections[node] = connections
+
+        return connections
+
+    def get_reverse_connections(self, node):
+        """
+        Args:
+            node(NodegraphAPI.Node):
+
+        Returns:
+            tuple of NodegraphAPI.Port:
+                input ports connected to the node's output ports, in output
+                ports order.
+        """
+        if not self.is_live:
+            return node_get_output_connections(node)
+
+        connections = self.__reverse.get(node)
+        if connections is None:
+            connections = node_get_output_connections(node)
+            self.__reverse[node] = connections
+
+        return connections
+
+    def process_event(self, event_type, event_args):
+
+        if event_type == "node_delete":
+            node = event_args.get("node")
+            # ports connected to the deleted node might still be referenced
+            for adjacency in (self.__connections, self.__reverse):
+                for knode, connections in list(adjacency.items()):
+                    if knode == node or any(
+                            port.getNode() == node for port in connections
+                    ):
+                        del adjacency[knode]
+            return
+
+        self.invalidate(Cache.get_event_nodes(event_args))
+        return
+
+    def invalidate(self, nodes):
+        for node in nodes:
+            self.__connections.pop(node, None)
+            self.__reverse.pop(node, None)
+        return
+
+    def clear(self):
+        self.__connections = dict()
+        self.__reverse = dict()
+        return
+
+
+graph_index = GraphIndex()
+
+
+class GroupIndex(Cache.EventCache):
+    """
+    Result of the parsing inside GroupNodes kept in memory between parsing.
+
+    For each GroupNode and output port parsed, store the ordered list of
+    nodes inside the group that were added to the output, and the name of the
+    group's input ports the parsing leaved the group from. The next parsing
+    going through the same group/port can then skip the group content.
+
+    The entries of a group are dropped as soon as a connection event is
+    received for the group or any node inside it. Renaming events too, as
+    the parsing depends on node names (stop_names and scope settings).
+
+    Attributes:
+        __summaries(dict of NodegraphAPI.GroupNode: dict):
+            {group: {key: (tuple of nodes, frozenset of input port names)}}
+    """
+
+    events = (
+        "port_connect",
+        "port_disconnect",
+        "node_create",
+        "node_delete",
+        "node_setName",
+    )
+
+    def __init__(self):
+
+        super(GroupIndex, self).__init__()
+        self.__summaries = dict()
+
+        return
+
+    def __len__(self):
+        return len(self.__summaries)
+
+    @staticmethod
+    def get_key(port_name, settings):
+        """
+        Args:
+            port_name(str or None): output port of the group the parsing
+                comes from, None if the group is the parsing source.
+            settings(ParseSettings): settings used for the parsing.
+
+        Returns:
+            tuple: key to use with get/set.
+        """
+        return (
+            port_name,
+            settings.include_groups,
+            tuple(sorted(settings.exluded_asGroupsNodeType)),
+            tuple(sorted(settings.stop_types)),
+            tuple(sorted(settings.stop_names)),
+            settings.scope,
+        )
+
+    def get(self, grp_node, key):
+        """
+        Args:
+            grp_node(NodegraphAPI.GroupNode):
+            key(tuple): see get_key
+
+        Returns:
+            tuple or None:
+                (tuple of NodegraphAPI.Node, frozenset of str) or None if
+                the group was not stored yet.
+        """
+        return self.__summaries.get(grp_node, dict()).get(key)
+
+    def set(self, grp_node, key, nodes, exits):
+        """
+        Args:
+            grp_node(NodegraphAPI.GroupNode):
+            key(tuple): see get_key
+            nodes(list of NodegraphAPI.Node):
+                nodes inside the group in the order they were added to the
+                output.
+            exits(set of str): name of the group input ports the parsing
+                leaved the group from.
+        """
+        self.__summaries.setdefault(grp_node, dict())[key] = (
+            tuple(nodes),
+            frozenset(exits)
+        )
+        return
+
+    def process_event(self, event_type, event_args):
+
+        # deleted node might not be parented anymore
+        if event_type == "node_delete":
+            self.clear()
+            return
+
+        self.invalidate(Cache.get_event_nodes(event_args))
+        return
+
+    def invalidate(self, nodes):
+        # the content of all the parent groups changed too
+        for node in nodes:
+            while node is not None:
+                self.__summaries.pop(node, None)
+                node = node.getParent()
+        return
+
+    def clear(self):
+        self.__summaries = dict()
+        return
+
+
+group_index = GroupIndex()
+
+
+class GraphStateCache(Cache.EventCache):
+    """
+    Memoize if nodes have a GraphState, which is used by logical parsing to
+    know if a connection contributes to building the scene.
+
+    By default values are only kept for a single parsing (or a whole
+    ``SceneParser.get_upstream_nodes_many`` call). With ``per_time`` set to
+    True, they are kept between parsing as long as the cache is live, the
+    nodegraph time doesn't change, and no event is received.
+
+    Attributes:
+        per_time(bool): see above.
+        hits(int): number of queries answered from the cache.
+        misses(int): number of queries that needed the nodegraph.
+        __states(dict of NodegraphAPI.Node: bool):
+        __time(float or None): nodegraph time __states were queried at.
+    """
+
+    # any event that trigger an editor update can change the GraphState
+    events = None
+
+    def __init__(self):
+
+        super(GraphStateCache, self).__init__()
+        self.per_time = False
+        self.hits = 0
+        self.misses = 0
+        self.__states = dict()
+        self.__time = None
+
+        return
+
+    def __len__(self):
+        return len(self.__states)
+
+    def begin(self):
+        """
+        To call before a parsing, to determine if the previous values can be
+        kept.
+        """
+        # the nodegraph is not changing for the holder
+        if self.is_held and self.__time is not None:
+            return
+
+        time = NodegraphAPI.GetCurrentTime()
+        if not (self.per_time and self.is_live and time == self.__time):
+            self.__states = dict()
+
+        self.__time = time
+        return
+
+    def has_graph_state(self, node):
+        """
+        Args:
+            node(NodegraphAPI.Node):
+
+        Returns:
+            bool: True if the node has a GraphState.
+        """
+        try:
+            value = self.__states[node]
+        except KeyError:
+            self.misses += 1
+            value = self.__states[node] = bool(node.getGraphState())
+            return value
+
+        self.hits += 1
+        return value
 
+    def get_stats(self):
+        """
+        Returns:
+            dict: hits, misses and number of nodes currently stored.
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": len(self)}
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        return
+
+    def hold(self, enabled):
+        # values stored before might be outdated
+        if enabled and not self.is_held:
+            self.clear()
+        super(GraphStateCache, self).hold(enabled)
+        return
+
+    def process_event(self, event_type, event_args):
+        self.clear()
+        return
+
+    def clear(self):
+        self.__states = dict()
+        self.__time = None
+        return
+
+
+graph_state_cache = GraphStateCache()
+
+
+def node_get_input_connections(node):
+    """
+    From a given node return the output ports connected to its inputs.
+
+    Args:
+        node(NodegraphAPI.Node):
+
+    Returns:
+        tuple of NodeGraphAPI.Port: in the order of the node's input ports.
+    """
+
+    output = list()
 
-def node_get_connections(node, logical=True):
+    for in_port in node.getInputPorts():
+        # we assume input port can only have one connection
+        connected_port = in_port.getConnectedPort(0)
+        if connected_port:
+            output.append(connected_port)
+
+    return tuple(output)
+
+
+def node_get_output_connections(node):
+    """
+    From a given node return the input ports connected to its outputs.
+
+    Args:
+        node(NodegraphAPI.Node):
+
+    Returns:
+        tuple of NodeGraphAPI.Port: in the order of the node's output ports.
     """
-    From a given node return a set of the connected output ports .
+
+    output = list()
+
+    for out_port in node.getOutputPorts():
+        output.extend(out_port.getConnectedPorts())
+
+    return tuple(output)
+
+
+def node_get_connections(
+        node,
+        logical=True,
+        index=None,
+        graph_states=None,
+        downstream=False
+):
+    """
+    From a given node return a set of the connected output ports (or input
+    ports if downstream).
 
     If logical is set to True only port's nodes contributing to building
     the scene as returned. For example, in the case of a VariableSwitch,
@@ -310,23 +1462,40 @@ def node_get_connections(node, logical=True):
     Args:
         logical(bool): True to return only logical connections.
         node(NodegraphAPI.Node):
+        index(GraphIndex or None):
+            index to query the connections from, else the nodegraph is used.
+        graph_states(GraphStateCache or None):
+            cache to query the GraphState from, else the nodegraph is used.
+        downstream(bool):
+            True to return the ports connected to the node outputs.
 
     Returns:
         set of NodeGraphAPI.Port: set of ports connected to the passed node
     """
 
+    if downstream:
+        if index is not None:
+            connected_ports = index.get_reverse_connections(node)
+        else:
+            connected_ports = node_get_output_connections(node)
+    elif index is not None:
+        connected_ports = index.get_connections(node)
+    else:
+        connected_ports = node_get_input_connections(node)
+
     output = set()
-    in_ports = node.getInputPorts()
 
-    for in_port in in_ports:
-        # we assume input port can only have one connection
-        connected_port = in_port.getConnectedPort(0)
-        if not connected_port:
-            continue
+    for connected_port in connected_ports:
 
         if logical:
             # Having a GraphState means the node is evaluated.
-            if connected_port.getNode().getGraphState():
+            if graph_states is not None:
+                has_graph_state = graph_states.has_graph_state(
+                    connected_port.getNode()
+                )
+            else:
+                has_graph_state = connected_port.getNode().getGraphState()
+            if has_graph_state:
                 output.add(connected_port)
         else:
             output.add(connected_port)
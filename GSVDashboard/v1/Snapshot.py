@@ -0,0 +1,470 @@
+"""
+Compact, array based, snapshot of the nodegraph for repeated queries.
+
+[LICENSE]
+
+    Copyright 2022 Liam Collod
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+
+"""
+import logging
+from array import array
+
+import NodegraphAPI
+
+from . import c
+from .SceneParse import ParseSettings
+
+__all__ = ["NodegraphSnapshot"]
+
+logger = logging.getLogger("{}.Snapshot".format(c.name))
+
+
+class NodegraphSnapshot(object):
+    """
+    The nodegraph at a given time stored in flat arrays where nodes are
+    identified by their index. Built with a single pass over the nodegraph.
+
+    Connections are stored as CSR (compressed sparse row) : the connections
+    of the inputs of node ``i`` are at ``edge_offsets[i]:edge_offsets[i+1]``
+    in the ``edge_*`` arrays. Same for the ports connected to the inside of
+    the groups outputs (return ports) with the ``return_*`` arrays.
+
+    Strings (node types, port names) are stored once in tables and referenced
+    by their index.
+
+    Attributes:
+        time(float): nodegraph time the snapshot was built at.
+        names(list of str): node names
+        types(array of int): node type index in ``type_names``
+        type_names(list of str):
+        bypassed(array of int): 1 if the node is bypassed
+        parents(array of int): parent node index, -1 if None
+        groups(array of int): 1 if the node is a GroupNode
+        graph_state(array of int): 1 if the node has a GraphState (logical)
+        first_output(array of int): name index of the node first output port,
+            -1 if no output port.
+        port_names(list of str):
+        edge_offsets(array of int): size is number of nodes + 1
+        edge_nodes(array of int): node the input is connected to
+        edge_ports(array of int): name index of the port the input is
+            connected to.
+        return_offsets(array of int): size is number of nodes + 1
+        return_ports(array of int): name index of the group output port
+        return_nodes(array of int): node the return port is connected to, -1
+            if not connected.
+        return_src_ports(array of int): name index of the port the return
+            port is connected to, -1 if not connected.
+    """
+
+    __arrays = (
+        "types",
+        "bypassed",
+        "parents",
+        "groups",
+        "graph_state",
+        "first_output",
+        "edge_offsets",
+        "edge_nodes",
+        "edge_ports",
+        "return_offsets",
+        "return_ports",
+        "return_nodes",
+        "return_src_ports",
+    )
+
+    # kind of work items that can be found in the stack (see get_upstream)
+    __visit = 0
+    __ports = 1
+    __group_exit = 2
+
+    def __init__(self):
+
+        self.time = 0.0
+        self.names = list()  # type: List[str]
+        self.type_names = list()  # type: List[str]
+        self.port_names = list()  # type: List[str]
+        for array_name in self.__arrays:
+            setattr(self, array_name, array("i"))
+
+        self.__indexes = dict()  # type: dict
+        self.edge_offsets.append(0)
+        self.return_offsets.append(0)
+
+        return
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def build(cls, graph_state=True):
+        """
+        Create a new snapshot of the current nodegraph.
+
+        Args:
+            graph_state(bool):
+                True to query if each node has a GraphState, needed for
+                logical queries. Else every node is considered as logical.
+
+        Returns:
+            NodegraphSnapshot:
+        """
+
+        snapshot = cls()
+        snapshot.time = NodegraphAPI.GetCurrentTime()
+
+        knodes = NodegraphAPI.GetAllNodes()
+        indexes = dict((knode, index) for index, knode in enumerate(knodes))
+        type_names = dict()
+        port_names = dict()
+
+        def intern_name(table, names, name):
+            index = table.get(name)
+            if index is None:
+                index = len(names)
+                table[name] = index
+                names.append(name)
+            return index
+
+        for knode in knodes:
+
+            snapshot.names.append(knode.getName())
+            snapshot.types.append(
+                intern_name(type_names, snapshot.type_names, knode.getType())
+            )
+            snapshot.bypassed.append(1 if knode.isBypassed() else 0)
+            snapshot.parents.append(indexes.get(knode.getParent(), -1))
+            is_group = isinstance(knode, NodegraphAPI.GroupNode)
+            snapshot.groups.append(1 if is_group else 0)
+            snapshot.graph_state.append(
+                1 if not graph_state or knode.getGraphState() else 0
+            )
+
+            out_ports = knode.getOutputPorts()
+            snapshot.first_output.append(
+                intern_name(
+                    port_names, snapshot.port_names, out_ports[0].getName()
+                ) if out_ports else -1
+            )
+
+            for in_port in knode.getInputPorts():
+                # we assume input port can only have one connection
+                connected_port = in_port.getConnectedPort(0)
+                if not connected_port:
+                    continue
+                snapshot.edge_nodes.append(
+                    indexes[connected_port.getNode()]
+                )
+                snapshot.edge_ports.append(intern_name(
+                    port_names, snapshot.port_names, connected_port.getName()
+                ))
+
+            snapshot.edge_offsets.append(len(snapshot.edge_nodes))
+
+            if is_group:
+                for out_port in out_ports:
+
+                    snapshot.return_ports.append(intern_name(
+                        port_names, snapshot.port_names, out_port.getName()
+                    ))
+                    return_port = knode.getReturnPort(out_port.getName())
+                    connected_ports = (
+                        return_port.getConnectedPorts() if return_port else []
+                    )
+                    if connected_ports:
+                        snapshot.return_nodes.append(
+                            indexes[connected_ports[0].getNode()]
+                        )
+                        snapshot.return_src_ports.append(intern_name(
+                            port_names,
+                            snapshot.port_names,
+                            connected_ports[0].getName()
+                        ))
+                    else:
+                        snapshot.return_nodes.append(-1)
+                        snapshot.return_src_ports.append(-1)
+
+            snapshot.return_offsets.append(len(snapshot.return_nodes))
+
+            continue
+
+        logger.debug(
+            "[NodegraphSnapshot][build] Finished with {} nodes and {} "
+            "connections.".format(len(snapshot), len(snapshot.edge_nodes))
+        )
+        return snapshot
+
+    def get_index(self, node_name):
+        """
+        Args:
+            node_name(str):
+
+        Returns:
+            int: index of the node in the snapshot, -1 if not found.
+        """
+        if len(self.__indexes) != len(self.names):
+            self.__indexes = dict(
+                (name, index) for index, name in enumerate(self.names)
+            )
+        return self.__indexes.get(node_name, -1)
+
+    def get_names(self, indexes):
+        """
+        Args:
+            indexes(list of int):
+
+        Returns:
+            list of str: node names for the given node indexes.
+        """
+        return [self.names[index] for index in indexes]
+
+    def get_upstream(self, source, settings=None):
+        """
+        Same as ``SceneParse.SceneParser.get_upstream_nodes`` but performed
+        on the snapshot.
+
+        Connections are processed in the node's input ports order, the
+        "pseudo-order" can as such differ from the one of SceneParser (and
+        for groups with multiple outputs, which output is parsed).
+
+        The ``max_depth``, ``scope`` and ``downstream`` settings are not
+        supported and must keep their default value.
+
+        Args:
+            source(int or str): index or name of the node to start from.
+            settings(ParseSettings or None): None to use the default.
+
+        Returns:
+            list of int: node indexes in "pseudo-order"
+
+        Raises:
+            ValueError: if the source is not found or an unsupported setting
+                is used.
+        """
+
+        settings = settings or ParseSettings()
+        unsupported = [
+            key for key, value in (
+                ("max_depth", settings.max_depth is not None),
+                ("scope", settings.scope is not None),
+                ("downstream", settings.downstream),
+            ) if value
+        ]
+        if unsupported:
+            raise ValueError(
+                "[get_upstream] Settings <{}> are not supported on a snapshot."
+                "".format(unsupported)
+            )
+
+        if not isinstance(source, int):
+            source = self.get_index(source)
+        if source < 0:
+            raise ValueError(
+                "[get_upstream] Source node not found in the snapshot."
+            )
+
+        include_groups = settings.include_groups
+        logical = settings.logical
+        excluded = self.__get_type_indexes(settings.exluded_asGroupsNodeType)
+        stop_types = self.__get_type_indexes(settings.stop_types)
+        stop_names = frozenset(settings.stop_names)
+        stop_nodes = frozenset(
+            index for index, name in enumerate(self.names)
+            if name in stop_names
+        )
+        emit_types = None
+        if settings.emit_types is not None:
+            emit_types = self.__get_type_indexes(settings.emit_types)
+
+        types = self.types
+        groups = self.groups
+        buffer = list()
+        visited = bytearray(len(self.names))
+
+        def add_to_buffer(node):
+            buffer.append(node)
+            visited[node] = 1
+
+        # same work items as SceneParser but with (node, port name) instead of
+        # a Port object. -1 as port name means the node was passed directly.
+        stack = [(self.__visit, source, -1, -1)]
+
+        while stack:
+
+            work_item = stack.pop()
+
+            if work_item[0] == self.__ports:
+
+                connections = work_item[1]
+                for connected_node, connected_port in connections:
+
+                    # avoid processing multiples times the same node/port
+                    if visited[connected_node]:
+                        continue
+
+                    stack.append(work_item)
+                    stack.append((
+                        self.__visit,
+                        connected_node,
+                        connected_port,
+                        work_item[2]
+                    ))
+                    break
+
+                continue
+
+            if work_item[0] == self.__group_exit:
+
+                grp_node = work_item[1]
+                stack.append(
+                    (self.__ports, self.__iter_connections(grp_node, logical),
+                     grp_node)
+                )
+                continue
+
+            node, port, grp_node = work_item[1], work_item[2], work_item[3]
+
+            # going out of a group
+            if grp_node == node:
+                if include_groups:
+                    add_to_buffer(node)
+                continue
+
+            if types[node] in stop_types or node in stop_nodes:
+                if include_groups or not groups[node]:
+                    add_to_buffer(node)
+                continue
+
+            if groups[node] and types[node] not in excluded:
+
+                entry = self.__get_group_entry(node, port)
+                if include_groups:
+                    add_to_buffer(node)
+                stack.append((self.__group_exit, node))
+                stack.append((self.__visit, entry[0], entry[1], node))
+                continue
+
+            add_to_buffer(node)
+            stack.append(
+                (self.__ports, self.__iter_connections(node, logical),
+                 grp_node)
+            )
+
+            continue
+
+        if emit_types is not None:
+            buffer = [node for node in buffer if types[node] in emit_types]
+
+        return buffer
+
+    def __get_type_indexes(self, type_names):
+        """
+        Args:
+            type_names(list of str):
+
+        Returns:
+            frozenset of int: index of the given types in ``type_names``
+        """
+        type_names = set(type_names)
+        return frozenset(
+            index for index, type_name in enumerate(self.type_names)
+            if type_name in type_names
+        )
+
+    def __iter_connections(self, node, logical):
+        """
+        Args:
+            node(int):
+            logical(bool): True to only yield logical connections.
+
+        Yields:
+            tuple of int: (node, port name) connected to each node input.
+        """
+        for edge in range(self.edge_offsets[node], self.edge_offsets[node + 1]):
+            connected_node = self.edge_nodes[edge]
+            if logical and not self.graph_state[connected_node]:
+                continue
+            yield connected_node, self.edge_ports[edge]
+
+    def __get_group_entry(self, grp_node, port):
+        """
+        Args:
+            grp_node(int): group node index
+            port(int): name index of the group output port, -1 for the first.
+
+        Returns:
+            tuple of int: (node, port name) connected inside the group to the
+                given output port.
+        """
+        if port < 0:
+            port = self.first_output[grp_node]
+            if port < 0:
+                raise TypeError(
+                    "The given source_obj[0] is a GroupNode with no output "
+                    "port which is not currently supported."
+                )
+
+        start = self.return_offsets[grp_node]
+        end = self.return_offsets[grp_node + 1]
+        for index in range(start, end):
+            if self.return_ports[index] != port:
+                continue
+            if self.return_nodes[index] < 0:
+                raise IndexError(
+                    "Return port <{}> on node <{}> is not connected."
+                    "".format(self.port_names[port], self.names[grp_node])
+                )
+            return self.return_nodes[index], self.return_src_ports[index]
+
+        raise RuntimeError(
+            "[get_upstream][is grp] No Return port found on node <{}> with "
+            "source port <{}>.".format(
+                self.names[grp_node], self.port_names[port]
+            )
+        )
+
+    def todict(self):
+        """
+        Return a dictionary representation of the snapshot that can be
+        serialized (ex: json) and given back to ``fromdict``.
+        """
+        output = {
+            "time": self.time,
+            "names": list(self.names),
+            "type_names": list(self.type_names),
+            "port_names": list(self.port_names),
+        }
+        for array_name in self.__arrays:
+            output[array_name] = getattr(self, array_name).tolist()
+
+        return output
+
+    @classmethod
+    def fromdict(cls, data):
+        """
+        Args:
+            data(dict): as returned by ``todict``
+
+        Returns:
+            NodegraphSnapshot:
+        """
+        snapshot = cls()
+        snapshot.time = data["time"]
+        snapshot.names = list(data["names"])
+        snapshot.type_names = list(data["type_names"])
+        snapshot.port_names = list(data["port_names"])
+        for array_name in cls.__arrays:
+            setattr(snapshot, array_name, array("i", data[array_name]))
+
+        return snapshot
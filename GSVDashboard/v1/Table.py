@@ -0,0 +1,281 @@
+"""
+Columnar, array based, view of a built GSVScene for bulk queries.
+
+[LICENSE]
+
+    Copyright 2022 Liam Collod
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+
+"""
+import logging
+from array import array
+from collections import OrderedDict
+
+from . import c
+from .GSV import GSVNode
+
+__all__ = ["GSVTable"]
+
+logger = logging.getLogger("{}.Table".format(c.name))
+
+
+class GSVTable(object):
+    """
+    A built GSVScene stored as parallel arrays with one row per
+    (node, gsv, value) triplet. Rows of a same node are contiguous and in the
+    scene's node order.
+
+    Strings are stored once in tables and referenced by their index (id).
+    GSVs excluded in the scene settings and gsvs without values are not
+    stored. Like the scene, disabled nodes are not stored unless the table
+    is built with ``include_bypassed``.
+
+    Attributes:
+        gsvnodes(list of GSVNode): node table, node id is the index.
+        gsv_names(list of str): gsv table, gsv id is the index.
+        value_names(list of str): value table, value id is the index.
+        action_names(tuple of str): action table, action id is the index.
+        node_ids(array of int): node id of each row
+        gsv_ids(array of int): gsv id of each row
+        value_ids(array of int): value id of each row
+        actions(array of int): action id of the row's node
+        bypassed(array of int): 1 if the row's node is bypassed
+    """
+
+    __arrays = (
+        "node_ids",
+        "gsv_ids",
+        "value_ids",
+        "actions",
+        "bypassed",
+    )
+
+    action_names = (GSVNode.action_getter, GSVNode.action_setter)
+
+    def __init__(self):
+
+        self.gsvnodes = list()  # type: List[GSVNode]
+        self.gsv_names = list()  # type: List[str]
+        self.value_names = list()  # type: List[str]
+        for array_name in self.__arrays:
+            setattr(self, array_name, array("i"))
+
+        self.__gsv_indexes = dict()  # type: dict
+        self.__value_indexes = dict()  # type: dict
+
+        return
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    @classmethod
+    def build(cls, scene, include_bypassed=False):
+        """
+        Create a new table from the given scene.
+
+        Args:
+            scene(GSVScene): must have been built.
+            include_bypassed(bool):
+                True to also store the disabled nodes, found by parsing the
+                nodegraph again (see GSVScene.iter_nodes). The scene's nodes
+                are reused.
+
+        Returns:
+            GSVTable:
+        """
+
+        table = cls()
+        action_indexes = dict(
+            (action, index) for index, action in enumerate(cls.action_names)
+        )
+
+        gsvnodes = scene.nodes
+        if include_bypassed:
+            built = dict((gsvnode.node, gsvnode) for gsvnode in scene.nodes)
+            gsvnodes = [
+                built.get(gsvnode.node, gsvnode)
+                for gsvnode in scene.iter_nodes(include_bypassed=True)
+            ]
+
+        for node_id, gsvnode in enumerate(gsvnodes):
+
+            table.gsvnodes.append(gsvnode)
+            action = action_indexes[gsvnode.gsv_action]
+            bypassed = 1 if gsvnode.node.isBypassed() else 0
+
+            for gsvname, gsvvalues in gsvnode.gsvs.items():
+
+                if not isinstance(gsvvalues, tuple):
+                    continue
+                if gsvname in scene.compiled.excluded:
+                    continue
+
+                gsv_id = table.__intern(
+                    table.__gsv_indexes, table.gsv_names, gsvname
+                )
+                # same value can be used multiple times on a node
+                value_ids = OrderedDict()
+                for value in gsvvalues:
+                    value_ids[table.__intern(
+                        table.__value_indexes, table.value_names, str(value)
+                    )] = None
+
+                for value_id in value_ids:
+                    table.node_ids.append(node_id)
+                    table.gsv_ids.append(gsv_id)
+                    table.value_ids.append(value_id)
+                    table.actions.append(action)
+                    table.bypassed.append(bypassed)
+
+                continue
+
+            continue
+
+        logger.debug(
+            "[GSVTable][build] Finished with {} rows for {} nodes."
+            "".format(len(table), len(table.gsvnodes))
+        )
+        return table
+
+    @staticmethod
+    def __intern(indexes, names, name):
+        """
+        Args:
+            indexes(dict): name: index
+            names(list of str): table to add the name to
+            name(str):
+
+        Returns:
+            int: index of the name in the table, added if not already.
+        """
+        index = indexes.get(name)
+        if index is None:
+            index = len(names)
+            indexes[name] = index
+            names.append(name)
+        return index
+
+    def get_gsv_id(self, gsv_name):
+        """
+        Args:
+            gsv_name(str):
+
+        Returns:
+            int: id of the gsv in the table, -1 if not found.
+        """
+        return self.__gsv_indexes.get(gsv_name, -1)
+
+    def get_value_id(self, value):
+        """
+        Args:
+            value(str):
+
+        Returns:
+            int: id of the value in the table, -1 if not found.
+        """
+        return self.__value_indexes.get(value, -1)
+
+    def get_rows(self, gsv=None, value=None, action=None, bypassed=None):
+        """
+        Rows matching all the given filters, None to not filter.
+
+        Args:
+            gsv(str or None): gsv name
+            value(str or None):
+            action(str or None): one of ``action_names``
+            bypassed(bool or None):
+
+        Returns:
+            array of int: row indexes in ascending order.
+        """
+
+        filters = list()
+        if gsv is not None:
+            filters.append((self.gsv_ids, self.get_gsv_id(gsv)))
+        if value is not None:
+            filters.append((self.value_ids, self.get_value_id(value)))
+        if action is not None:
+            action = (
+                self.action_names.index(action)
+                if action in self.action_names else -1
+            )
+            filters.append((self.actions, action))
+        if bypassed is not None:
+            filters.append((self.bypassed, 1 if bypassed else 0))
+
+        if any(wanted < 0 for _, wanted in filters):
+            return array("i")
+
+        if not filters:
+            return array("i", range(len(self)))
+
+        # first filter scan the whole column, next ones only the rows kept
+        column, wanted = filters[0]
+        rows = [row for row, item in enumerate(column) if item == wanted]
+        for column, wanted in filters[1:]:
+            rows = [row for row in rows if column[row] == wanted]
+
+        return array("i", rows)
+
+    def get_nodes(self, gsv, value=None):
+        """
+        Args:
+            gsv(str): gsv name
+            value(str or None): to only return the nodes using this value.
+
+        Returns:
+            list of GSVNode: nodes using the given gsv, in the scene order.
+        """
+        node_ids = OrderedDict()
+        for row in self.get_rows(gsv=gsv, value=value):
+            node_ids[self.node_ids[row]] = None
+
+        return [self.gsvnodes[node_id] for node_id in node_ids]
+
+    def get_value_counts(self, gsv):
+        """
+        Args:
+            gsv(str): gsv name
+
+        Returns:
+            OrderedDict: ``{value: number of nodes using it}`` for the given
+                gsv, values in the order they were first found.
+        """
+        counts = [0] * len(self.value_names)
+        for row in self.get_rows(gsv=gsv):
+            counts[self.value_ids[row]] += 1
+
+        # value ids are assigned in the order values are found
+        return OrderedDict(
+            (self.value_names[value_id], count)
+            for value_id, count in enumerate(counts) if count
+        )
+
+    def get_gsv_counts(self):
+        """
+        Returns:
+            OrderedDict: ``{gsv name: number of nodes using it}`` in the order
+                gsvs were first found.
+        """
+        counts = [0] * len(self.gsv_names)
+        last_nodes = [-1] * len(self.gsv_names)
+
+        # a node rows are contiguous, so a node is counted once per gsv
+        for node_id, gsv_id in zip(self.node_ids, self.gsv_ids):
+            if last_nodes[gsv_id] == node_id:
+                continue
+            last_nodes[gsv_id] = node_id
+            counts[gsv_id] += 1
+
+        return OrderedDict(zip(self.gsv_names, counts))
@@ -18,25 +18,235 @@ Configure scene parsing settings from parameters in the scene.
     limitations under the License.
 
 """
+import copy
+import json
 import logging
+import os
 try:
     from typing import Optional, List
 except ImportError:
     pass
 
 from . import c
+from . import Cache
 from . import GSV
 
 from Katana import NodegraphAPI
 
 __all__ = [
-    "get_parse_settings"
+    "get_parse_settings",
+    "ParseSettingsCache",
+    "parse_settings_cache",
+    "SettingsFile",
+    "settings_file",
+    "SETTINGS_FILE_ENV",
 ]
 
 logger = logging.getLogger("{}.config".format(c.name))
 
+# environment variable with the path of the studio settings json file
+SETTINGS_FILE_ENV = "GSVDB_SETTINGS_FILE"
 
-def __get_settings_from_param(sparam):
+
+class SettingsFile(object):
+    """
+    Studio-wide settings read from the json file whose path is in the
+    ``GSVDB_SETTINGS_FILE`` environment variable. The file is only read
+    again when its path or modification time changes.
+
+    Keys are the same as the user parameters (see __get_settings_from_param)
+    but list values are json arrays (a comma separated str is also accepted).
+    All keys are optional. Ex::
+
+        {
+            "excluded_gsv_names": ["gafferState"],
+            "excluded_as_grpnode_type": ["GafferThree", "Importomatic"],
+            "max_depth": 0
+        }
+
+    Attributes:
+        __path(str or None): path of the file last read
+        __mtime(float or None): modification time of the file last read
+        __data(dict or None): normalized content of the file last read
+    """
+
+    __lists = (
+        "excluded_gsv_names",
+        "excluded_as_grpnode_type",
+        "stop_at_names",
+        "stop_at_types",
+    )
+
+    def __init__(self):
+
+        self.__path = None
+        self.__mtime = None
+        self.__data = None
+
+        return
+
+    def get(self):
+        """
+        Returns:
+            dict or None:
+                content of the file with list values as frozensets, None if
+                no file is specified or it can't be read. The same object is
+                returned until the file changes. To not modify.
+        """
+
+        path = os.environ.get(SETTINGS_FILE_ENV)
+        if not path:
+            self.__path = self.__mtime = self.__data = None
+            return None
+
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError as excp:
+            if path != self.__path:
+                logger.error(
+                    "[SettingsFile][get] Can't access settings file <{}> "
+                    "specified in ${}: {}".format(path, SETTINGS_FILE_ENV, excp)
+                )
+            self.__path = path
+            self.__mtime = self.__data = None
+            return None
+
+        if path == self.__path and mtime == self.__mtime:
+            return self.__data
+
+        self.__path = path
+        self.__mtime = mtime
+        try:
+            self.__data = self.__read(path)
+        except (IOError, ValueError) as excp:
+            logger.error(
+                "[SettingsFile][get] Invalid settings file <{}>, ignored: {}"
+                "".format(path, excp)
+            )
+            self.__data = None
+
+        logger.debug(
+            "[SettingsFile][get] Read <{}>: {}".format(path, self.__data)
+        )
+        return self.__data
+
+    @classmethod
+    def __read(cls, path):
+        """
+        Args:
+            path(str): json file path
+
+        Returns:
+            dict: normalized file content
+
+        Raises:
+            IOError: if the file can't be read.
+            ValueError: if the file content is not valid.
+        """
+
+        with open(path, "r") as json_file:
+            content = json.load(json_file)
+
+        if not isinstance(content, dict):
+            raise ValueError("Root must be a json object.")
+
+        data = dict()
+
+        for key in cls.__lists:
+            if key not in content:
+                continue
+            value = content[key] or list()
+            if isinstance(value, (str, type(u""))):
+                value = value.replace(" ", "").split(",")
+            if not isinstance(value, list) or not all(
+                    isinstance(item, (str, type(u""))) for item in value
+            ):
+                raise ValueError(
+                    "Key <{}> must be a list of str.".format(key)
+                )
+            data[key] = frozenset(value)
+
+        if "max_depth" in content:
+            value = content["max_depth"] or 0
+            # bool is a subclass of int
+            if isinstance(value, bool) or not isinstance(value, int) or (
+                    value < 0
+            ):
+                raise ValueError("Key <max_depth> must be a positive int.")
+            data["max_depth"] = value if value > 0 else None
+
+        if "scope_group" in content:
+            value = content["scope_group"] or None
+            if not isinstance(value, (str, type(u""), type(None))):
+                raise ValueError("Key <scope_group> must be a str.")
+            data["scope_group"] = value
+
+        return data
+
+
+settings_file = SettingsFile()
+
+
+def __get_default_settings():
+    """
+    Returns:
+        GSV.GSVSettings: settings used when nothing is configured.
+    """
+    settings = GSV.GSVSettings()
+    settings["excluded"] = ["gafferState"]
+    settings["parsing"]["excluded"]["asGroupsNodeType"] = [
+        "GafferThree",
+        "Importomatic",
+        "LookFileLightAndConstraintActivator",
+        "LookFileMultiBake",
+        "LookFileManager",
+        "NetworkMaterials",
+        "ShadingGroup",
+    ]
+    return settings
+
+
+def __get_from_file(data):
+    """
+    Args:
+        data(dict): as returned by SettingsFile.get
+
+    Returns:
+        GSV.GSVSettings: default settings overriden by the file ones.
+    """
+
+    settings = __get_default_settings()
+
+    if "excluded_gsv_names" in data:
+        settings["excluded"] = sorted(data["excluded_gsv_names"])
+    if "excluded_as_grpnode_type" in data:
+        settings["parsing"]["excluded"]["asGroupsNodeType"] = sorted(
+            data["excluded_as_grpnode_type"]
+        )
+    if "max_depth" in data:
+        settings["parsing"]["max_depth"] = data["max_depth"]
+    if "stop_at_names" in data:
+        settings["parsing"]["stop_names"] = sorted(data["stop_at_names"])
+    if "stop_at_types" in data:
+        settings["parsing"]["stop_types"] = sorted(data["stop_at_types"])
+    if "scope_group" in data:
+        value = data["scope_group"]
+        # the file is shared by all the scenes, the group might not exist
+        if value and not isinstance(
+                NodegraphAPI.GetNode(value), NodegraphAPI.GroupNode
+        ):
+            logger.error(
+                "[config][__get_from_file] Given scope group <{}> doesn't "
+                "exists or is not a group. Check <scope_group> in the settings"
+                " file is correct.".format(value)
+            )
+            value = None
+        settings["parsing"]["scope"] = value
+
+    return settings
+
+
+def __get_settings_from_param(sparam, base=None):
     """
     Parse the given parameter and generate Settings from it.
     Child parameters excepted are :
@@ -45,9 +255,20 @@ def __get_settings_from_param(sparam):
         - gsvdb_excluded_gsv_names: same as above
     - excluded_as_grpnode_type(str): comma separated list
         - gsvdb_excluded_as_grpnode_type: same as above
+    - max_depth(int): maximum number of connections followed, 0 for no limit
+        - gsvdb_max_depth: same as above
+    - stop_at_names(str): comma separated list of node names
+        - gsvdb_stop_at_names: same as above
+    - stop_at_types(str): comma separated list of node types
+        - gsvdb_stop_at_types: same as above
+    - scope_group(str): name of the group node the parsing must stay inside
+        - gsvdb_scope_group: same as above
 
     Args:
         sparam(NodegraphAPI.Parameter): param to get the child from
+        base(GSV.GSVSettings or None):
+            settings the parameters found override, modified in place. The
+            default settings are used if None.
 
     Returns:
         GSV.GSVSettings or None:
@@ -55,7 +276,8 @@ def __get_settings_from_param(sparam):
     """
 
     time = NodegraphAPI.GetCurrentTime()
-    settings = GSV.GSVSettings()
+    # parameters not specified keep their default value
+    settings = base if base is not None else __get_default_settings()
     # to determine if the settings was modified at least one time
     _set = False
 
@@ -81,15 +303,72 @@ def __get_settings_from_param(sparam):
         settings["parsing"]["excluded"]["asGroupsNodeType"] = value
         _set = True
 
+    setting1 = (
+            sparam.getChild("max_depth") or
+            sparam.getChild("gsvdb_max_depth")
+    )
+    if setting1:
+        value = setting1.getValue(time)
+        try:
+            value = int(value or 0)
+        except (TypeError, ValueError):
+            logger.error(
+                "[config][__get_settings_from_param] Given max depth <{}> is "
+                "not an integer. Check <{}> parameter is correct."
+                "".format(value, setting1.getFullName())
+            )
+            value = 0
+        settings["parsing"]["max_depth"] = value if value > 0 else None
+        _set = True
+
+    setting1 = (
+            sparam.getChild("stop_at_names") or
+            sparam.getChild("gsvdb_stop_at_names")
+    )
+    if setting1:
+        value = setting1.getValue(time)  # type: Optional[str]
+        value = value.replace(" ", "").split(",") if value else list()
+        settings["parsing"]["stop_names"] = value
+        _set = True
+
+    setting1 = (
+            sparam.getChild("stop_at_types") or
+            sparam.getChild("gsvdb_stop_at_types")
+    )
+    if setting1:
+        value = setting1.getValue(time)  # type: Optional[str]
+        value = value.replace(" ", "").split(",") if value else list()
+        settings["parsing"]["stop_types"] = value
+        _set = True
+
+    setting1 = (
+            sparam.getChild("scope_group") or
+            sparam.getChild("gsvdb_scope_group")
+    )
+    if setting1:
+        value = setting1.getValue(time)  # type: Optional[str]
+        if value and not isinstance(
+                NodegraphAPI.GetNode(value), NodegraphAPI.GroupNode
+        ):
+            logger.error(
+                "[config][__get_settings_from_param] Given scope group <{}> "
+                "doesn't exists or is not a group. Check <{}> parameter is "
+                "correct.".format(value, setting1.getFullName())
+            )
+            value = None
+        settings["parsing"]["scope"] = value or None
+        _set = True
+
     return settings if _set else None
 
 
-def __get_from_node(node):
+def __get_from_node(node, base=None):
     """
 
     Args:
         node(NodegraphAPI.Node): node with the user parameters for
             settings config.
+        base(GSV.GSVSettings or None): see __get_settings_from_param
 
     Returns:
         GSV.GSVSettings or None:
@@ -100,7 +379,7 @@ def __get_from_node(node):
         return None
 
     prm_user = node.getParameter("user")
-    settings = __get_settings_from_param(prm_user)
+    settings = __get_settings_from_param(prm_user, base)
 
     logger.debug(
         "[__get_from_node] Finished with settings <{}>".format(settings)
@@ -108,9 +387,12 @@ def __get_from_node(node):
     return settings
 
 
-def __get_from_project():
+def __get_from_project(base=None):
     """
 
+    Args:
+        base(GSV.GSVSettings or None): see __get_settings_from_param
+
     Returns:
         GSV.GSVSettings or None:
            see __get_settings_from_param doctsring
@@ -125,7 +407,7 @@ def __get_from_project():
         logger.debug(
             "[__get_from_project] Returned. Found node <GSVDB_config>"
         )
-        return __get_from_node(node)
+        return __get_from_node(node, base)
 
     # then parse project.user parameters
     uprm_proj = NodegraphAPI.GetRootNode().getParameter("user")
@@ -146,21 +428,185 @@ def __get_from_project():
         logger.debug(
             "[__get_from_project] Returned. Found node <{}>".format(node_name)
         )
-        return __get_from_node(node)
+        return __get_from_node(node, base)
 
     # parse the user parameter and generate settings from them
-    settings = __get_settings_from_param(uprm_proj)
+    settings = __get_settings_from_param(uprm_proj, base)
     logger.debug(
         "[__get_from_project] Finished with settings <{}>".format(settings)
     )
     return settings
 
 
+def _get_settings(file_data=None):
+    """
+    Args:
+        file_data(dict or None): as returned by SettingsFile.get
+
+    Returns:
+        GSV.GSVSettings: see get_parse_settings
+    """
+    # scene parameters are layered over the file ones, so they are always
+    # read : nothing tells if they changed without ParseSettingsCache.
+    base = __get_from_file(file_data) if file_data is not None else None
+    settings = __get_from_project(base)
+
+    if not settings:
+        settings = base or __get_default_settings()
+
+    return settings
+
+
+class ParseSettingsCache(Cache.EventCache):
+    """
+    Settings resolved from the scene parameters, kept while live and
+    resolved again only when an event is received for :
+
+    - a parameter of the config node or under the root ``user`` parameter
+    - the creation, renaming or deletion of a node named as the config node
+      (``GSVDB_config`` or ``project.user.gsvdb_config_node``) or as the
+      scope group.
+
+    Or when the settings file changed (see SettingsFile).
+
+    Attributes:
+        __settings(GSV.GSVSettings or None): None if not resolved yet.
+        __node(NodegraphAPI.Node or None):
+            config node the settings were resolved from.
+        __names(set of str): node names the settings depend on.
+        __file_data(dict or None): settings file content used.
+    """
+
+    events = (
+        "parameter_finalizeValue",
+        "parameter_setValue",
+        "parameter_setKey",
+        "parameter_removeKey",
+        "parameter_replaceXML",
+        "parameter_createChild",
+        "parameter_deleteChild",
+        "node_create",
+        "node_setName",
+        "node_delete",
+    )
+
+    def __init__(self):
+
+        super(ParseSettingsCache, self).__init__()
+        self.__settings = None
+        self.__node = None
+        self.__names = set()
+        self.__file_data = None
+
+        return
+
+    def __resolve(self, file_data):
+        """
+        Resolve the settings and find what they depend on.
+
+        Args:
+            file_data(dict or None): as returned by SettingsFile.get
+        """
+
+        self.__settings = _get_settings(file_data)
+        self.__file_data = file_data
+        self.__node = NodegraphAPI.GetNode("GSVDB_config")
+        self.__names = set(["GSVDB_config"])
+
+        uprm_proj = NodegraphAPI.GetRootNode().getParameter("user")
+        uprm_gsvdb_node = (
+            uprm_proj.getChild("gsvdb_config_node") if uprm_proj else None
+        )
+        if uprm_gsvdb_node:
+            node_name = uprm_gsvdb_node.getValue(NodegraphAPI.GetCurrentTime())
+            self.__names.add(node_name)
+            self.__node = self.__node or NodegraphAPI.GetNode(node_name)
+
+        scope = self.__settings["parsing"].get("scope")
+        if scope:
+            self.__names.add(scope)
+        # dropped if the group doesn't exist yet
+        if file_data and file_data.get("scope_group"):
+            self.__names.add(file_data["scope_group"])
+
+        return
+
+    def get(self):
+        """
+        While live, the nodegraph is only queried when the settings have to
+        be resolved again. Else the scene parameters are read on each call,
+        even if a settings file is used, as they override it.
+
+        Returns:
+            GSV.GSVSettings: copy of the resolved settings, can be modified.
+        """
+        file_data = settings_file.get()
+        if not self.is_live:
+            return _get_settings(file_data)
+
+        if self.__settings is None or file_data is not self.__file_data:
+            self.__resolve(file_data)
+
+        # GSVSettings validate on each key set so copy as a dict first
+        return GSV.GSVSettings(copy.deepcopy(dict(self.__settings)))
+
+    def process_event(self, event_type, event_args):
+
+        if self.__settings is None:
+            return
+
+        if event_type.startswith("node_"):
+
+            node = event_args.get("node")
+            names = set(
+                event_args.get(key)
+                for key in ("nodeName", "oldName", "newName")
+            )
+            if hasattr(node, "getName"):
+                names.add(node.getName())
+            if node is self.__node or names & self.__names:
+                self.clear()
+            return
+
+        param = event_args.get("param")
+        if param is None or not hasattr(param, "getNode"):
+            return
+
+        node = param.getNode()
+        if self.__node is not None and node == self.__node:
+            self.clear()
+        elif node == NodegraphAPI.GetRootNode():
+            # "" is the root parameter itself
+            if param.getFullName(False).split(".")[0] in ("user", ""):
+                self.clear()
+
+        return
+
+    def invalidate(self, nodes):
+        if self.__node in nodes or NodegraphAPI.GetRootNode() in nodes:
+            self.clear()
+        return
+
+    def clear(self):
+        self.__settings = None
+        self.__node = None
+        self.__names = set()
+        self.__file_data = None
+        return
+
+
+parse_settings_cache = ParseSettingsCache()
+
+
 def get_parse_settings():
     """
-    Parse scene for parameter used to configure the GSVSettings.
+    Parse scene for parameter used to configure the GSVSettings, layered
+    over the studio settings file if specified (see SettingsFile).
     Generate a default one if nothing found.
 
+    The result is cached while an editor is listening to events, see
+    ParseSettingsCache.
+
     Settings that can't be modified here (overiden later):
     - settings["parsing"]["mode"]
     - settings["parsing"]["source"]
@@ -168,19 +614,4 @@ def get_parse_settings():
     Returns:
         GSV.GSVSettings:
     """
-    settings = __get_from_project()
-
-    if not settings:
-        settings = GSV.GSVSettings()
-        settings["excluded"] = ["gafferState"]
-        settings["parsing"]["excluded"]["asGroupsNodeType"] = [
-            "GafferThree",
-            "Importomatic",
-            "LookFileLightAndConstraintActivator",
-            "LookFileMultiBake",
-            "LookFileManager",
-            "NetworkMaterials",
-            "ShadingGroup",
-        ]
-
-    return settings
\ No newline at end of file
+    return parse_settings_cache.get()
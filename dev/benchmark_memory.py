@@ -0,0 +1,226 @@
+"""
+version=1
+python>=2.7
+
+Benchmark memory
+
+Compare the memory used by the GSVNode/GSVObject representations of a
+synthetic scene against the previous dict/list based representation.
+
+Must be run from Katana's Python (the super-tool imports Katana modules),
+ex: ``katana --script dev/benchmark_memory.py``. No node is created in the
+nodegraph, nodes are lightweight stand-ins.
+"""
+from __future__ import print_function
+
+import os
+import random
+import sys
+from collections import OrderedDict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from GSVDashboard.v1 import GSV
+
+
+CONFIG = {
+    "nodes": 100000,
+    "gsvs": 200,
+    "values": 50,
+    "gsv_per_node": 3,
+    "seed": 1,
+}
+
+
+class FakeNode(object):
+    """
+    Minimal stand-in for NodegraphAPI.Node, only what GSVNode needs.
+    """
+
+    __slots__ = ("name", "type", "gsvs")
+
+    def __init__(self, name, node_type, gsvs):
+        self.name = name
+        self.type = node_type
+        self.gsvs = gsvs
+
+    def getName(self):
+        return self.name
+
+    def getType(self):
+        return self.type
+
+
+def fake_structure(node):
+    # new objects each call like a real extraction from parameters
+    return dict(
+        (str(name), [str(value) for value in values])
+        for name, values in node.gsvs.items()
+    )
+
+
+class LegacyGSVNode(object):
+    """
+    GSVNode as it was before slots : instance dict and list values.
+    """
+
+    def __init__(self, node, scene):
+        self.scene = scene
+        self.node = node
+        self.type = node.getType()
+        self.gsv_action = scene.settings["nodes"][self.type]["action"]
+        structure = scene.settings["nodes"][self.type]["structure"]
+        self.gsvs = structure(node)
+
+
+class LegacyGSVObject(object):
+    """
+    GSVObject as it was before slots : instance dict and list attributes.
+    """
+
+    def __init__(self, name, scene, nodes, values):
+        self.name = name
+        self.scene = scene
+        self.nodes = list(nodes)
+        self.values = list(values)
+        self.type = None
+
+
+def get_deep_size(obj, ignored_ids):
+    """
+    Args:
+        obj(any):
+        ignored_ids(set of int): id of objects already counted or shared
+            between both representations (scene, knodes). Modified in place.
+
+    Returns:
+        int: size in bytes of obj and everything it references.
+    """
+    size = 0
+    stack = [obj]
+
+    while stack:
+
+        obj = stack.pop()
+        if id(obj) in ignored_ids:
+            continue
+        ignored_ids.add(id(obj))
+        size += sys.getsizeof(obj)
+
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+
+        if hasattr(obj, "__dict__"):
+            stack.append(obj.__dict__)
+        for slot in getattr(type(obj), "__slots__", tuple()):
+            # private slots are name mangled
+            if slot.startswith("__") and not slot.endswith("__"):
+                slot = "_{}{}".format(type(obj).__name__.lstrip("_"), slot)
+            if hasattr(obj, slot):
+                stack.append(getattr(obj, slot))
+
+    return size
+
+
+def build_knodes():
+    """
+    Returns:
+        list of FakeNode:
+    """
+    rng = random.Random(CONFIG["seed"])
+    gsv_names = ["gsv{}".format(index) for index in range(CONFIG["gsvs"])]
+    gsv_values = ["value{}".format(index) for index in range(CONFIG["values"])]
+
+    knodes = list()
+    for index in range(CONFIG["nodes"]):
+        gsvs = dict(
+            (name, rng.sample(gsv_values, rng.randint(1, 4)))
+            for name in rng.sample(gsv_names, CONFIG["gsv_per_node"])
+        )
+        knodes.append(FakeNode("node{}".format(index), "FakeGetter", gsvs))
+
+    return knodes
+
+
+def index_nodes(gsvnodes):
+    """
+    Returns:
+        tuple: (gsv_nodes, gsv_values) same as GSVScene
+    """
+    gsv_nodes = OrderedDict()
+    gsv_values = dict()
+    for gsvnode in gsvnodes:
+        for gsvname, gsvvalues in gsvnode.gsvs.items():
+            gsv_nodes.setdefault(gsvname, list()).append(gsvnode)
+            values = gsv_values.setdefault(gsvname, OrderedDict())
+            for value in gsvvalues:
+                values[str(value)] = None
+
+    return gsv_nodes, gsv_values
+
+
+def run():
+
+    knodes = build_knodes()
+    settings = GSV.GSVSettings()
+    settings["nodes"] = {
+        "FakeGetter": {"action": "getter", "structure": fake_structure}
+    }
+    scene = GSV.GSVScene(settings)
+    # shared by both representations, not counted
+    shared = set([id(scene), id(settings)] + [id(knode) for knode in knodes])
+
+    results = OrderedDict()
+
+    nodes = [LegacyGSVNode(knode, scene) for knode in knodes]
+    gsv_nodes, gsv_values = index_nodes(nodes)
+    gsvs = [
+        LegacyGSVObject(name, scene, gsv_nodes[name], gsv_values[name])
+        for name in gsv_nodes
+    ]
+    results["legacy"] = (
+        get_deep_size(nodes, set(shared)),
+        get_deep_size(gsvs, set(shared) | set(id(node) for node in nodes)),
+    )
+    del nodes, gsv_nodes, gsv_values, gsvs
+
+    nodes = [GSV.GSVNode(knode, scene) for knode in knodes]
+    scene.gsv_nodes, scene.gsv_values = index_nodes(nodes)
+    gsvs = list()
+    for name in scene.gsv_nodes:
+        gsv = GSV.GSVObject(name, scene)
+        gsv.build()
+        # attributes are lazy
+        gsv.nodes, gsv.values
+        gsvs.append(gsv)
+    # the scene index is not counted for legacy either
+    index = [scene.gsv_nodes, scene.gsv_values, scene.global_gsvs]
+    results["slotted"] = (
+        get_deep_size(nodes, set(shared)),
+        get_deep_size(
+            gsvs,
+            set(shared) | set(id(node) for node in nodes) | set(map(id, index))
+        ),
+    )
+
+    print(
+        "{nodes} nodes, {gsvs} gsvs, {values} values per gsv"
+        "".format(**CONFIG)
+    )
+    for name, (nodes_size, gsvs_size) in results.items():
+        print(
+            "{:<8} GSVNode: {:>8.1f} MB   GSVObject: {:>6.2f} MB"
+            "".format(name, nodes_size / 1e6, gsvs_size / 1e6)
+        )
+
+    legacy = sum(results["legacy"])
+    slotted = sum(results["slotted"])
+    print("saved {:.1f}%".format(100.0 * (legacy - slotted) / legacy))
+    return
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,255 @@
+"""
+version=1
+python>=2.7
+
+Test regressions
+
+Regression tests of the nodegraph parsing and settings resolution.
+
+Must be run from Katana's Python (the super-tool imports Katana modules),
+ex: ``katana --script dev/test_regressions.py``. Nodes are created in a new
+empty project.
+"""
+from __future__ import print_function
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from Katana import KatanaFile
+from Katana import NodegraphAPI
+
+from GSVDashboard.v1 import config
+from GSVDashboard.v1 import SceneParse
+
+
+def create_node(name, parent=None, inputs=1):
+    """
+    Args:
+        name(str):
+        parent(NodegraphAPI.GroupNode or None): root node if None
+        inputs(int): number of input ports to add
+
+    Returns:
+        NodegraphAPI.Node: Merge node with the given number of inputs
+    """
+    node = NodegraphAPI.CreateNode(
+        "Merge", parent or NodegraphAPI.GetRootNode()
+    )
+    node.setName(name)
+    for index in range(inputs):
+        node.addInputPort("i{}".format(index))
+    return node
+
+
+def connect(upstream, downstream, port_name="i0"):
+    """
+    Connect the output of upstream to the given input of downstream.
+    """
+    downstream.getInputPort(port_name).connect(
+        upstream.getOutputPortByIndex(0)
+    )
+    return
+
+
+class TestDownstreamGroups(unittest.TestCase):
+    """
+    A group reached downstream from several of its inputs must be parsed
+    from each of them.
+
+    ::
+
+        S -> A -> G.i0 -> X -> M -> G.o0 -> D
+        S -> B -> G.i1 -> Y ---^
+    """
+
+    def setUp(self):
+
+        KatanaFile.New()
+
+        self.source = create_node("S", inputs=0)
+        node_a = create_node("A")
+        node_b = create_node("B")
+        connect(self.source, node_a)
+        connect(self.source, node_b)
+
+        group = NodegraphAPI.CreateNode("Group", NodegraphAPI.GetRootNode())
+        group.setName("G")
+        group.addInputPort("i0")
+        group.addInputPort("i1")
+        group.addOutputPort("o0")
+        group.getInputPort("i0").connect(node_a.getOutputPortByIndex(0))
+        group.getInputPort("i1").connect(node_b.getOutputPortByIndex(0))
+
+        node_x = create_node("X", parent=group)
+        node_y = create_node("Y", parent=group)
+        node_m = create_node("M", parent=group, inputs=2)
+        node_x.getInputPort("i0").connect(group.getSendPort("i0"))
+        node_y.getInputPort("i0").connect(group.getSendPort("i1"))
+        connect(node_x, node_m, "i0")
+        connect(node_y, node_m, "i1")
+        group.getReturnPort("o0").connect(node_m.getOutputPortByIndex(0))
+
+        node_d = create_node("D")
+        connect(group, node_d)
+
+        self.group = group
+        return
+
+    def parse(self, include_groups=True, max_depth=None):
+        """
+        Returns:
+            list of str: name of the nodes downstream of the source
+        """
+        settings = SceneParse.ParseSettings()
+        settings["downstream"] = True
+        settings["logical"] = False
+        settings["include_groups"] = include_groups
+        settings["max_depth"] = max_depth
+
+        parser = SceneParse.SceneParser()
+        parser.settings = settings
+        nodes = parser.get_upstream_nodes(self.source)
+        return [node.getName() for node in nodes]
+
+    def test_all_inputs_parsed(self):
+
+        for include_groups in (True, False):
+            names = self.parse(include_groups=include_groups)
+            self.assertEqual(len(names), len(set(names)))
+            self.assertTrue(
+                set(["X", "Y", "M", "D"]).issubset(names), names
+            )
+            self.assertEqual("G" in names, include_groups)
+
+        return
+
+    def test_max_depth_same_as_unlimited(self):
+
+        for include_groups in (True, False):
+            unlimited = self.parse(include_groups=include_groups)
+            limited = self.parse(include_groups=include_groups, max_depth=100)
+            self.assertEqual(len(limited), len(set(limited)))
+            self.assertEqual(sorted(unlimited), sorted(limited))
+
+        return
+
+
+class TestProjectSettings(unittest.TestCase):
+    """
+    Settings configured from the ``project.user`` parameters.
+    """
+
+    def setUp(self):
+
+        KatanaFile.New()
+        # only the scene parameters are tested
+        self.settings_file = os.environ.pop(config.SETTINGS_FILE_ENV, None)
+
+        root = NodegraphAPI.GetRootNode()
+        self.user = (
+            root.getParameter("user") or
+            root.getParameters().createChildGroup("user")
+        )
+        return
+
+    def tearDown(self):
+
+        if self.settings_file is not None:
+            os.environ[config.SETTINGS_FILE_ENV] = self.settings_file
+        return
+
+    def test_max_depth_keeps_default_exclusions(self):
+
+        default = config.get_parse_settings()
+
+        self.user.createChildNumber("gsvdb_max_depth", 3)
+        settings = config.get_parse_settings()
+
+        self.assertEqual(settings["parsing"]["max_depth"], 3)
+        self.assertEqual(settings["excluded"], default["excluded"])
+        self.assertIn("gafferState", settings["excluded"])
+        self.assertEqual(
+            settings["parsing"]["excluded"]["asGroupsNodeType"],
+            default["parsing"]["excluded"]["asGroupsNodeType"],
+        )
+        self.assertIn(
+            "GafferThree",
+            settings["parsing"]["excluded"]["asGroupsNodeType"]
+        )
+        return
+
+
+class TestSettingsFile(unittest.TestCase):
+    """
+    Validation of the studio settings file content.
+    """
+
+    def setUp(self):
+
+        self.settings_file = os.environ.get(config.SETTINGS_FILE_ENV)
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "settings.json")
+        os.environ[config.SETTINGS_FILE_ENV] = self.path
+        return
+
+    def tearDown(self):
+
+        shutil.rmtree(self.directory)
+        if self.settings_file is None:
+            os.environ.pop(config.SETTINGS_FILE_ENV, None)
+        else:
+            os.environ[config.SETTINGS_FILE_ENV] = self.settings_file
+        return
+
+    def read(self, content):
+        """
+        Args:
+            content(any): json serializable file content
+
+        Returns:
+            dict or None: see SettingsFile.get
+        """
+        with open(self.path, "w") as json_file:
+            json.dump(content, json_file)
+        # new instance, the file is always read
+        return config.SettingsFile().get()
+
+    def test_valid(self):
+
+        data = self.read({
+            "excluded_gsv_names": ["gafferState"],
+            "stop_at_types": "Render, Dot",
+            "max_depth": 3,
+        })
+        self.assertEqual(
+            data["excluded_gsv_names"], frozenset(["gafferState"])
+        )
+        self.assertEqual(data["stop_at_types"], frozenset(["Render", "Dot"]))
+        self.assertEqual(data["max_depth"], 3)
+        self.assertIsNone(self.read({"max_depth": 0})["max_depth"])
+        return
+
+    def test_invalid(self):
+
+        invalid = (
+            ["max_depth"],
+            {"max_depth": True},
+            {"max_depth": -1},
+            {"max_depth": "3"},
+            {"excluded_gsv_names": ["gafferState", 1]},
+            {"scope_group": ["shot"]},
+        )
+        for content in invalid:
+            self.assertIsNone(self.read(content), content)
+
+        return
+
+
+if __name__ == '__main__':
+    unittest.main(argv=[sys.argv[0]], exit=False)